@@ -20,17 +20,37 @@ import subprocess
 import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
 
 import cv2
 import numpy as np
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DEFAULT_CONFIG = PROJECT_ROOT / "config" / "cameras.yaml"
 
 STREAM_SIZE = (640, 480)  # per-camera decode resolution
 
+# Pillow-SIMD (published with ".postN" versions) has faster AVX2 box and
+# bilinear resize kernels than OpenCV; stock Pillow does not, so skip it.
+try:
+    import PIL
+    from PIL import Image
+
+    USE_PIL_RESIZE = ".post" in PIL.__version__
+    _PIL_FILTERS = {cv2.INTER_AREA: Image.BOX, cv2.INTER_LINEAR: Image.BILINEAR}
+except ImportError:
+    USE_PIL_RESIZE = False
+    _PIL_FILTERS = {}
+
 
 class FfmpegStream:
     """Reads raw BGR frames from an ffmpeg subprocess (for SDP/SRTP)."""
@@ -39,8 +59,13 @@ class FfmpegStream:
         self._width = width
         self._height = height
         self._frame_size = width * height * 3
+        # Three preallocated frames: each read fills one that is neither the
+        # latest frame nor the one the caller still has in use.
+        self._bufs = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(3)]
+        self._last: np.ndarray | None = None
         cmd = [
             "ffmpeg",
+            "-fflags", "nobuffer", "-flags", "low_delay",
             "-protocol_whitelist", "file,udp,srtp,rtp",
             "-i", sdp_file,
             "-f", "rawvideo",
@@ -50,19 +75,30 @@ class FfmpegStream:
             "-loglevel", "warning",
             "pipe:1",
         ]
+        # Unbuffered pipe: frames are read straight from the fd into the
+        # frame buffers, skipping the BufferedReader's intermediate copy.
         self._proc = subprocess.Popen(
             cmd, stdin=subprocess.DEVNULL,
-            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0,
         )
-
-    def read(self) -> tuple[bool, np.ndarray | None]:
-        data = self._proc.stdout.read(self._frame_size)
-        if not data or len(data) != self._frame_size:
-            return False, None
-        frame = np.frombuffer(data, dtype=np.uint8).reshape(
-            (self._height, self._width, 3)
-        )
-        return True, frame.copy()
+        self._fd = self._proc.stdout.fileno()
+
+    def read(self, in_use: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        """Read the next frame into a reused buffer.
+
+        The returned array stays intact through the next call, and after
+        that for as long as it is passed back as in_use.
+        """
+        buf = next(b for b in self._bufs if b is not self._last and b is not in_use)
+        view = memoryview(buf).cast("B")
+        got = 0
+        while got < self._frame_size:
+            n = os.readv(self._fd, [view[got:]])
+            if not n:
+                return False, None
+            got += n
+        self._last = buf
+        return True, buf
 
     def release(self):
         try:
@@ -89,8 +125,13 @@ class CameraFeed:
         self.rtsp_url = rtsp_url
         self.sdp_file = sdp_file
 
-        self._frame: np.ndarray | None = None
+        # Handoff between the reader thread and the tile workers: _in_use is
+        # the frame being resized, which an FfmpegStream never refills.
+        # The lock is only held to swap references, never across I/O.
         self._lock = threading.Lock()
+        self._frame: np.ndarray | None = None
+        self._in_use: np.ndarray | None = None
+        self.seq = 0  # bumped after every new frame
         self._stop = threading.Event()
         self._thread = threading.Thread(target=self._loop, daemon=True,
                                         name=f"feed-{name}")
@@ -101,10 +142,16 @@ class CameraFeed:
     def stop(self):
         self._stop.set()
 
-    @property
-    def frame(self) -> np.ndarray | None:
+    @contextmanager
+    def borrow_frame(self):
+        """Yield the latest frame, kept intact until the block exits."""
         with self._lock:
-            return self._frame
+            frame = self._in_use = self._frame
+        try:
+            yield frame
+        finally:
+            with self._lock:
+                self._in_use = None
 
     def _open(self):
         w, h = STREAM_SIZE
@@ -130,11 +177,17 @@ class CameraFeed:
 
             reconnect_delay = 5
             while not self._stop.is_set():
-                ret, frame = cap.read()
+                if isinstance(cap, FfmpegStream):
+                    with self._lock:
+                        in_use = self._in_use
+                    ret, frame = cap.read(in_use)
+                else:
+                    ret, frame = cap.read()  # a fresh array every call
                 if not ret:
                     break
                 with self._lock:
                     self._frame = frame
+                self.seq += 1
 
             cap.release()
 
@@ -160,20 +213,52 @@ def draw_label(frame: np.ndarray, text: str) -> None:
     thickness = 1
     (tw, th), baseline = cv2.getTextSize(text, font, scale, thickness)
     pad = 4
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (0, 0), (tw + pad * 2, th + baseline + pad * 2),
-                  (0, 0, 0), -1)
-    cv2.addWeighted(overlay, 0.6, frame, 0.4, 0, frame)
+    # Darken only the label box (40% of the original, i.e. a 60% black
+    # overlay) instead of blending a full-frame copy.
+    box = frame[:th + baseline + pad * 2, :tw + pad * 2]
+    cv2.convertScaleAbs(box, dst=box, alpha=0.4)
     cv2.putText(frame, text, (pad, th + pad), font, scale, (255, 255, 255),
                 thickness, cv2.LINE_AA)
 
 
+def pick_interpolation(src_w: int, src_h: int, dst_w: int, dst_h: int) -> int:
+    """Cheapest interpolation that still looks right for this scale."""
+    if src_w % dst_w == 0 and src_h % dst_h == 0:
+        # Integer downscale: nearest is plain strided sampling
+        return cv2.INTER_NEAREST
+    if dst_w < src_w and dst_h < src_h:
+        return cv2.INTER_AREA
+    return cv2.INTER_LINEAR
+
+
+def resize_into(frame: np.ndarray, cell: np.ndarray, interp: int) -> None:
+    """Resize frame into the cell view, via Pillow-SIMD when it is faster."""
+    h, w = cell.shape[:2]
+    pil_filter = _PIL_FILTERS.get(interp) if USE_PIL_RESIZE else None
+    if pil_filter is not None:
+        # Box/bilinear work per channel, so BGR order doesn't matter
+        cell[:] = np.asarray(Image.fromarray(frame).resize((w, h), pil_filter))
+    else:
+        cv2.resize(frame, (w, h), dst=cell, interpolation=interp)
+
+
+def snap_cell_size(cell_w: int, cell_h: int) -> tuple[int, int]:
+    """Shrink a cell to the largest integer fraction of STREAM_SIZE that fits."""
+    sw, sh = STREAM_SIZE
+    if cell_w >= sw and cell_h >= sh:
+        return cell_w, cell_h
+    common = math.gcd(sw, sh)
+    k = next(d for d in range(1, common + 1)
+             if common % d == 0 and sw // d <= cell_w and sh // d <= cell_h)
+    return sw // k, sh // k
+
+
 def load_cameras(config_path: Path) -> list[dict]:
     if not config_path.exists():
         print(f"Error: config not found at {config_path}", file=sys.stderr)
         sys.exit(1)
     with open(config_path) as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=_YamlLoader)
     cams = config.get("cameras", [])
     return [c for c in cams if c.get("enabled", True)]
 
@@ -190,6 +275,11 @@ def main():
                         help="Window height in pixels")
     parser.add_argument("--fps", type=int, default=15,
                         help="Target display refresh rate")
+    parser.add_argument("--snap", action="store_true",
+                        help="Shrink cells to an integer fraction of the "
+                             "stream size for cheaper resizing")
+    parser.add_argument("--opencl", action="store_true",
+                        help="Resize tiles on the GPU via OpenCL when available")
     args = parser.parse_args()
 
     cameras = load_cameras(args.config)
@@ -203,6 +293,9 @@ def main():
 
     cell_w = args.width // cols
     cell_h = args.height // rows
+    if args.snap:
+        cell_w, cell_h = snap_cell_size(cell_w, cell_h)
+        args.width, args.height = cols * cell_w, rows * cell_h
 
     feeds: list[CameraFeed] = []
     for cam in cameras:
@@ -219,38 +312,101 @@ def main():
           f"({args.width}x{args.height})")
     print("Press 'q' or ESC to quit.")
 
+    # Placeholders never change, so render them once and only copy them in
+    placeholders = {
+        feed.name: make_placeholder(cell_w, cell_h,
+                                    f"{feed.display_name}: connecting...")
+        for feed in feeds
+    }
+
     window = "Cambot Multiview"
     cv2.namedWindow(window, cv2.WINDOW_NORMAL)
     cv2.resizeWindow(window, args.width, args.height)
 
-    frame_delay = 1.0 / args.fps
-
-    try:
-        while True:
-            canvas = np.zeros((args.height, args.width, 3), dtype=np.uint8)
+    use_opencl = args.opencl and cv2.ocl.haveOpenCL()
+    if args.opencl and not use_opencl:
+        print("OpenCL not available, resizing on the CPU.", file=sys.stderr)
+    cv2.ocl.setUseOpenCL(use_opencl)
 
-            for idx, feed in enumerate(feeds):
-                row = idx // cols
-                col = idx % cols
-                x = col * cell_w
-                y = row * cell_h
+    frame_delay = 1.0 / args.fps
 
-                frame = feed.frame
-                if frame is not None:
-                    cell = cv2.resize(frame, (cell_w, cell_h))
+    # Feed seq last rendered into each tile of each canvas; tiles whose feed
+    # has no new frame keep their pixels and are skipped.
+    rendered = [[-1] * n for _ in range(2)]
+
+    def render_tile(canvas_idx: int, idx: int) -> None:
+        feed = feeds[idx]
+        seq = feed.seq
+        if rendered[canvas_idx][idx] == seq:
+            return
+        rendered[canvas_idx][idx] = seq
+
+        row = idx // cols
+        col = idx % cols
+        x = col * cell_w
+        y = row * cell_h
+
+        # Resize and label straight into the canvas, no temporary tile
+        cell = canvases[canvas_idx][y:y + cell_h, x:x + cell_w]
+        with feed.borrow_frame() as frame:
+            if frame is not None:
+                src_h, src_w = frame.shape[:2]
+                interp = pick_interpolation(src_w, src_h, cell_w, cell_h)
+                if use_opencl:
+                    # T-API: resize on the device, download into the tile
+                    cell[:] = cv2.resize(cv2.UMat(frame), (cell_w, cell_h),
+                                         interpolation=interp).get()
                 else:
-                    cell = make_placeholder(cell_w, cell_h,
-                                            f"{feed.display_name}: connecting...")
+                    resize_into(frame, cell, interp)
+            else:
+                cell[:] = placeholders[feed.name]
+
+        draw_label(cell, feed.display_name)
+
+    # Tiles are disjoint canvas slices, so they can be rendered in parallel;
+    # OpenCV releases the GIL. Keep OpenCV itself single-threaded so the
+    # tile workers don't oversubscribe the cores.
+    cv2.setNumThreads(1)
+    pool = ThreadPoolExecutor(max_workers=min(8, n), thread_name_prefix="tile")
+
+    # Every tile overwrites its whole cell each tick, so the canvases are
+    # allocated once; margins and unused cells are never written and stay black.
+    # Two canvases: a compose thread fills the back one while the GUI thread
+    # shows the front one, then they are swapped under swap_lock.
+    canvases = [np.zeros((args.height, args.width, 3), dtype=np.uint8)
+                for _ in range(2)]
+    front = 0
+    swap_lock = threading.Lock()
+    stop = threading.Event()
+
+    def compose_loop() -> None:
+        nonlocal front
+        while not stop.is_set():
+            started = time.monotonic()
+            for _ in pool.map(partial(render_tile, 1 - front), range(n)):
+                pass
+            with swap_lock:
+                front = 1 - front
+            stop.wait(max(0.0, frame_delay - (time.monotonic() - started)))
 
-                draw_label(cell, feed.display_name)
-                canvas[y:y + cell_h, x:x + cell_w] = cell
+    # HighGUI calls stay on the main thread (required on macOS); only
+    # composing moves off it.
+    composer = threading.Thread(target=compose_loop, daemon=True,
+                                name="compose")
+    composer.start()
 
-            cv2.imshow(window, canvas)
+    try:
+        while True:
+            with swap_lock:
+                cv2.imshow(window, canvases[front])
 
             key = cv2.waitKey(int(frame_delay * 1000)) & 0xFF
             if key in (ord("q"), 27):  # q or ESC
                 break
     finally:
+        stop.set()
+        composer.join()
+        pool.shutdown(wait=False)
         for feed in feeds:
             feed.stop()
         cv2.destroyAllWindows()
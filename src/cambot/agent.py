@@ -1,12 +1,29 @@
-import base64
+from __future__ import annotations
+
+import binascii
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import TYPE_CHECKING
 
 import anthropic
 
 from cambot.camera import CameraManager
 from cambot.context import MemoryStore
-from cambot.tools import TOOL_DEFINITIONS, execute_tool
+from cambot.tools import CONCURRENT_TOOLS, TOOL_DEFINITIONS, execute_tool
+
+if TYPE_CHECKING:
+    from cambot.motion import MotionEvent
+
+# One line of motion context per camera in motion-triggered checks
+_MOTION_LINE = (
+    "- {0.camera_name}: {0.motion_percentage:.1f}% motion, "
+    "{0.contour_count} regions, "
+    "{0.person_count} people detected "
+    "(was {0.previous_person_count}), "
+    "trigger={0.trigger}, "
+    "at {0.timestamp:%H:%M:%S} UTC"
+).format
 
 SYSTEM_PROMPT_TEMPLATE = """\
 You are a security monitoring assistant. The user has cameras across multiple \
@@ -105,8 +122,27 @@ class SecurityAgent:
         self.watcher = None  # set externally when watcher is enabled
         self.motion_detector = None  # set externally when motion detection is enabled
         self._pending_photos: list[tuple[bytes, str]] = []
+        self._prompt_cache: tuple[tuple, str] | None = None
+        # Runs the capture tools of one response concurrently
+        self._tool_pool = ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="agent-tool",
+        )
 
     def _get_system_prompt(self) -> str:
+        """Return the system prompt, rebuilt only when its inputs change."""
+        try:
+            st = self.memory_store.path.stat()
+            memory_key = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            memory_key = None
+        key = (memory_key, self.language, self.locale)
+        if self._prompt_cache is not None and self._prompt_cache[0] == key:
+            return self._prompt_cache[1]
+        prompt = self._build_system_prompt()
+        self._prompt_cache = (key, prompt)
+        return prompt
+
+    def _build_system_prompt(self) -> str:
         homes_cfg = self.config.get("homes", {})
         cameras_cfg = self.config.get("cameras", [])
 
@@ -118,17 +154,16 @@ class SecurityAgent:
         lines = []
         for home_id, cams in by_home.items():
             home_info = homes_cfg.get(home_id, {})
-            home_label = home_id
             if home_info.get("description"):
-                home_label += f" - {home_info['description']}"
-            lines.append(f"\n## {home_label}")
+                lines.append(f"\n## {home_id} - {home_info['description']}")
+            else:
+                lines.append(f"\n## {home_id}")
             for cam in cams:
-                cam_info = f"  - {cam['display_name']} ({cam['name']}): {cam.get('description', cam['location'])}"
+                lines.append(f"  - {cam['display_name']} ({cam['name']}): {cam.get('description', cam['location'])}")
                 if cam.get("typical_activity"):
-                    cam_info += f"\n    Normal: {cam['typical_activity']}"
+                    lines.append(f"    Normal: {cam['typical_activity']}")
                 if cam.get("alert_conditions"):
-                    cam_info += f"\n    Alert: {cam['alert_conditions']}"
-                lines.append(cam_info)
+                    lines.append(f"    Alert: {cam['alert_conditions']}")
 
         # Inject memories if any exist
         memory_text = self.memory_store.read()
@@ -136,18 +171,19 @@ class SecurityAgent:
         if memory_text:
             memories_section = f"\nTHINGS THE USER HAS TOLD YOU:\n{memory_text}\n"
 
-        prompt = SYSTEM_PROMPT_TEMPLATE.format(
-            home_camera_context="\n".join(lines),
-            memories_section=memories_section,
-        )
+        parts = [
+            SYSTEM_PROMPT_TEMPLATE.format(
+                home_camera_context="\n".join(lines),
+                memories_section=memories_section,
+            )
+        ]
 
         if self.language:
-            lang_instruction = f"\nLANGUAGE: Always respond in {self.language}."
+            parts.append(f"\nLANGUAGE: Always respond in {self.language}.")
             if self.locale:
-                lang_instruction += f" Use locale {self.locale} for dates and times."
-            prompt += lang_instruction
+                parts.append(f" Use locale {self.locale} for dates and times.")
 
-        return prompt
+        return "".join(parts)
 
     def _run_turn(self) -> tuple[str, int | None, str | None, list[str] | None]:
         """Run the agent loop until it stops.
@@ -170,36 +206,57 @@ class SecurityAgent:
             if response.stop_reason != "tool_use":
                 return self._extract_text(response.content), scheduled_minutes, schedule_reason, focus_cameras
 
+            blocks = [b for b in response.content if b.type == "tool_use"]
+
+            # Captures spend their time waiting on cameras; when the model
+            # asks for several at once, start them all before collecting
+            futures = {}
+            if sum(b.name in CONCURRENT_TOOLS for b in blocks) > 1:
+                futures = {
+                    b.id: self._tool_pool.submit(self._execute_tool, b)
+                    for b in blocks if b.name in CONCURRENT_TOOLS
+                }
+
             tool_results = []
-            for block in response.content:
-                if block.type == "tool_use":
-                    if block.name == "schedule_next_check":
-                        scheduled_minutes = block.input.get("minutes")
-                        schedule_reason = block.input.get("reason")
-                        focus_cameras = block.input.get("focus_cameras")
-                    result = execute_tool(
-                        block.name,
-                        block.input,
-                        self.camera_manager,
-                        self.memory_store,
-                        watcher=self.watcher,
-                        photo_queue=self._pending_photos,
-                        motion_detector=self.motion_detector,
-                    )
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "content": result,
-                    })
+            for block in blocks:
+                if block.name == "schedule_next_check":
+                    scheduled_minutes = block.input.get("minutes")
+                    schedule_reason = block.input.get("reason")
+                    focus_cameras = block.input.get("focus_cameras")
+                future = futures.get(block.id)
+                if future is not None:
+                    result = future.result()
+                else:
+                    result = self._execute_tool(block)
+                tool_results.append({
+                    "type": "tool_result",
+                    "tool_use_id": block.id,
+                    "content": result,
+                })
 
             self.messages.append({"role": "user", "content": tool_results})
 
+    def _execute_tool(self, block) -> str | list[dict]:
+        return execute_tool(
+            block.name,
+            block.input,
+            self.camera_manager,
+            self.memory_store,
+            watcher=self.watcher,
+            photo_queue=self._pending_photos,
+            motion_detector=self.motion_detector,
+        )
+
     def pop_pending_photos(self) -> list[tuple[bytes, str]]:
         """Retrieve and clear any photos queued during the last turn."""
         photos = self._pending_photos[:]
         self._pending_photos.clear()
         return photos
 
+    def discard_pending_photos(self) -> None:
+        """Drop any photos queued during the last turn without returning them."""
+        self._pending_photos.clear()
+
     def chat(self, user_message: str) -> str:
         with self._lock:
             self._pending_photos.clear()
@@ -250,16 +307,17 @@ class SecurityAgent:
             return self._run_turn()
 
     def watch_motion(
-        self,
-        motion_cameras: list[str],
-        motion_context: str,
-        motion_snapshots: dict[str, bytes] | None = None,
+        self, motion_events: dict[str, MotionEvent],
     ) -> tuple[str, int | None, str | None, list[str] | None]:
-        """Motion-triggered watch check with pre-captured snapshots and person counts."""
+        """Motion-triggered watch check with pre-captured snapshots and person counts.
+
+        Takes the strongest pending event per camera, keyed by camera name.
+        """
         now = datetime.now(timezone.utc).strftime("%A, %Y-%m-%d %H:%M:%S UTC")
         self._pending_photos.clear()
 
-        camera_names_str = ", ".join(motion_cameras)
+        camera_names_str = ", ".join(motion_events)
+        motion_context = "\n".join(map(_MOTION_LINE, motion_events.values()))
         prompt = (
             f"[Motion-triggered check at {now}]\n"
             f"Motion was detected on the following cameras:\n{motion_context}\n\n"
@@ -277,20 +335,21 @@ class SecurityAgent:
         )
 
         content: list[dict] = [{"type": "text", "text": prompt}]
-        if motion_snapshots:
-            for cam_name, jpeg_data in motion_snapshots.items():
-                cam = self.camera_manager.cameras.get(cam_name)
-                if cam and jpeg_data:
-                    label = f"Motion snapshot from '{cam.display_name}' ({cam.home} / {cam.location}):"
-                    content.append({"type": "text", "text": label})
-                    content.append({
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": "image/jpeg",
-                            "data": base64.b64encode(jpeg_data).decode("ascii"),
-                        },
-                    })
+        cameras = self.camera_manager.cameras
+        for cam_name, event in motion_events.items():
+            jpeg_data = event.snapshot
+            cam = cameras.get(cam_name)
+            if cam and jpeg_data:
+                label = f"Motion snapshot from '{cam.display_name}' ({cam.home} / {cam.location}):"
+                content.append({"type": "text", "text": label})
+                content.append({
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": "image/jpeg",
+                        "data": binascii.b2a_base64(jpeg_data, newline=False).decode("ascii"),
+                    },
+                })
 
         with self._lock:
             self.messages.append({"role": "user", "content": content})
@@ -1,15 +1,17 @@
 from __future__ import annotations
 
 import subprocess
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from cambot.config import load_cameras_config
 
 if TYPE_CHECKING:
-    from cambot.capture import StreamCapture
+    from cambot.capture import MjpegCapture, StreamCapture
 
 
 class CameraCaptureError(Exception):
@@ -24,15 +26,44 @@ class Camera:
     location: str
     rtsp_url: str | None = None
     sdp_file: str | None = None
+    codec: str | None = None  # source codec hint, e.g. "mjpeg"
     enabled: bool = True
+    snapshot_cmd: tuple[str, ...] = field(default=(), repr=False)
+    snapshot_label: str = field(default="", repr=False)
+
+
+def _snapshot_command(cam: Camera, quality: str) -> tuple[str, ...]:
+    """Build the one-shot ffmpeg snapshot command for a camera."""
+    cmd = ["ffmpeg", "-y", "-fflags", "nobuffer", "-flags", "low_delay"]
+
+    if cam.sdp_file:
+        cmd += ["-protocol_whitelist", "file,udp,srtp,rtp", "-i", cam.sdp_file]
+    else:
+        # RTSP's DESCRIBE already carries the codec parameters, so skip the
+        # default multi-second probe; SDP/SRTP input needs it to find them
+        cmd += [
+            "-probesize", "32k", "-analyzeduration", "0",
+            "-rtsp_transport", "tcp", "-i", cam.rtsp_url,
+        ]
+
+    if cam.codec == "mjpeg":
+        # Source frames are already JPEG — pass one through, no re-encode
+        cmd += ["-c:v", "copy", "-bsf:v", "mjpeg2jpeg",
+                "-frames:v", "1", "-f", "image2", "pipe:1"]
+    else:
+        cmd += ["-frames:v", "1", "-q:v", quality, "-f", "image2", "pipe:1"]
+    return tuple(cmd)
 
 
 class CameraManager:
     def __init__(self, config_path: Path | None = None):
         self.cameras: dict[str, Camera] = {}
         self._streams: dict[str, StreamCapture] = {}
+        self._snapshot_readers: dict[str, MjpegCapture] = {}
+        self._readers_lock = threading.Lock()
         config = load_cameras_config(config_path)
         self._settings = config.get("settings", {})
+        quality = str(self._settings.get("snapshot_quality", 2))
 
         for cam_cfg in config["cameras"]:
             cam = Camera(
@@ -42,10 +73,38 @@ class CameraManager:
                 location=cam_cfg.get("location", "unknown"),
                 rtsp_url=cam_cfg.get("rtsp_url"),
                 sdp_file=cam_cfg.get("sdp_file"),
+                codec=cam_cfg.get("codec"),
                 enabled=cam_cfg.get("enabled", True),
             )
+            cam.snapshot_cmd = _snapshot_command(cam, quality)
+            cam.snapshot_label = (
+                f"Snapshot from '{cam.display_name}' ({cam.home} / {cam.location}):"
+            )
             self.cameras[cam.name] = cam
 
+        # Lookup indexes over enabled cameras, keyed by lowercased names.
+        # Location entries are stored under (location, home) and (location, None).
+        self._by_home: dict[str, list[Camera]] = {}
+        self._by_location: dict[tuple[str, str | None], list[Camera]] = {}
+        for cam in self.cameras.values():
+            if not cam.enabled:
+                continue
+            home, location = cam.home.lower(), cam.location.lower()
+            self._by_home.setdefault(home, []).append(cam)
+            self._by_location.setdefault((location, home), []).append(cam)
+            self._by_location.setdefault((location, None), []).append(cam)
+
+        # Camera set is fixed after load, so derived listings are built once
+        self._enabled_names = [c.name for c in self.cameras.values() if c.enabled]
+        self._homes = sorted(set(c.home for c in self.cameras.values()))
+        self._locations = sorted(set(c.location for c in self.cameras.values()))
+
+        # Reused across capture_multiple calls instead of a pool per call
+        self._pool = ThreadPoolExecutor(
+            max_workers=len(self.cameras) or 1,
+            thread_name_prefix="snapshot",
+        )
+
     def list_cameras(self) -> list[dict]:
         return [
             {
@@ -59,74 +118,106 @@ class CameraManager:
         ]
 
     def get_homes(self) -> list[str]:
-        return sorted(set(cam.home for cam in self.cameras.values()))
+        return list(self._homes)
+
+    def get_locations(self) -> list[str]:
+        return list(self._locations)
+
+    def get_enabled_names(self) -> list[str]:
+        return list(self._enabled_names)
 
     def get_cameras_by_home(self, home: str) -> list[Camera]:
-        return [
-            cam
-            for cam in self.cameras.values()
-            if cam.home.lower() == home.lower() and cam.enabled
-        ]
+        return list(self._by_home.get(home.lower(), ()))
 
     def set_streams(self, streams: dict[str, StreamCapture]) -> None:
         """Register shared stream captures for snapshot use."""
         self._streams = streams
 
     def get_cameras_by_location(self, location: str, home: str | None = None) -> list[Camera]:
-        results = []
-        for cam in self.cameras.values():
-            if not cam.enabled:
-                continue
-            if cam.location.lower() != location.lower():
-                continue
-            if home and cam.home.lower() != home.lower():
-                continue
-            results.append(cam)
-        return results
+        key = (location.lower(), home.lower() if home else None)
+        return list(self._by_location.get(key, ()))
 
     def capture_snapshot(self, camera_name: str, timeout: int | None = None) -> bytes:
-        if camera_name not in self.cameras:
+        cam = self.cameras.get(camera_name)
+        if cam is None:
             raise CameraCaptureError(f"Unknown camera: {camera_name}")
-
-        cam = self.cameras[camera_name]
         if not cam.enabled:
             raise CameraCaptureError(f"Camera '{camera_name}' is disabled")
 
         if timeout is None:
             timeout = self._settings.get("snapshot_timeout", 10)
+        # One deadline shared by all stages, so a capture never takes
+        # longer than timeout however many of them it falls through
+        deadline = time.monotonic() + timeout
+
+        def remaining() -> float:
+            return max(deadline - time.monotonic(), 0.0)
 
         # Prefer shared stream (avoids UDP port conflicts on SDP cameras)
         stream = self._streams.get(camera_name)
         if stream is not None and stream.is_connected:
-            jpeg = stream.get_jpeg(quality=90, timeout=timeout)
+            jpeg = stream.get_jpeg(quality=90, timeout=remaining())
             if jpeg is not None:
                 return jpeg
+        if stream is not None and cam.sdp_file:
+            # A standalone ffmpeg would bind the same UDP ports as the stream
+            raise CameraCaptureError(
+                f"No frame from stream - camera '{cam.display_name}' may be offline"
+            )
+        if not remaining():
+            raise CameraCaptureError(
+                f"No frame within {timeout}s - camera '{cam.display_name}' may be offline"
+            )
 
-        # Fallback: standalone ffmpeg (for cameras without an active shared stream)
-        return self._capture_ffmpeg(cam, timeout)
-
-    def _capture_ffmpeg(self, cam: Camera, timeout: int) -> bytes:
-        quality = str(self._settings.get("snapshot_quality", 2))
-
-        cmd = ["ffmpeg", "-y"]
-
-        if cam.sdp_file:
-            cmd += ["-protocol_whitelist", "file,udp,srtp,rtp", "-i", cam.sdp_file]
-        else:
-            cmd += ["-rtsp_transport", "tcp", "-i", cam.rtsp_url]
+        # Long-running MJPEG reader, warmed up on first use (RTSP only).
+        # A new or waking reader is opening its RTSP session, so wait on it
+        # rather than opening a second one with a standalone ffmpeg.
+        if cam.rtsp_url and self._settings.get("snapshot_keepalive", True):
+            reader, created = self._get_snapshot_reader(cam)
+            if created or reader.is_connected or reader.is_idle:
+                jpeg = reader.get_jpeg(timeout=remaining())
+                if jpeg is None:
+                    raise CameraCaptureError(
+                        f"No frame within {timeout}s - camera '{cam.display_name}' may be offline"
+                    )
+                return jpeg
 
-        cmd += ["-frames:v", "1", "-q:v", quality, "-f", "image2", "pipe:1"]
+        # Fallback: standalone ffmpeg (for cameras without an active shared stream)
+        return self._capture_ffmpeg(cam, remaining())
+
+    def _get_snapshot_reader(self, cam: Camera) -> tuple[MjpegCapture, bool]:
+        """Return the camera's snapshot reader and whether it was just started."""
+        with self._readers_lock:
+            reader = self._snapshot_readers.get(cam.name)
+            if reader is not None:
+                return reader, False
+            from cambot.capture import MjpegCapture
+
+            reader = MjpegCapture(
+                camera_name=cam.name,
+                rtsp_url=cam.rtsp_url,
+                quality=self._settings.get("snapshot_quality", 2),
+                codec=cam.codec,
+            )
+            reader.start()
+            self._snapshot_readers[cam.name] = reader
+            return reader, True
 
+    def _capture_ffmpeg(self, cam: Camera, timeout: float) -> bytes:
+        if timeout <= 0:
+            raise CameraCaptureError(
+                f"Capture timed out - camera '{cam.display_name}' may be offline"
+            )
         try:
             result = subprocess.run(
-                cmd,
+                cam.snapshot_cmd,
                 capture_output=True,
                 timeout=timeout,
                 check=False,
             )
         except subprocess.TimeoutExpired:
             raise CameraCaptureError(
-                f"Capture timed out after {timeout}s - camera '{cam.display_name}' may be offline"
+                f"Capture timed out after {timeout:.1f}s - camera '{cam.display_name}' may be offline"
             )
 
         if result.returncode != 0:
@@ -143,15 +234,22 @@ class CameraManager:
 
     def capture_multiple(self, camera_names: list[str], timeout: int | None = None) -> dict[str, bytes | str]:
         results: dict[str, bytes | str] = {}
-        with ThreadPoolExecutor(max_workers=len(camera_names)) as executor:
-            futures = {
-                executor.submit(self.capture_snapshot, name, timeout): name
-                for name in camera_names
-            }
-            for future in as_completed(futures):
-                name = futures[future]
-                try:
-                    results[name] = future.result()
-                except CameraCaptureError as e:
-                    results[name] = f"Error: {e}"
+        futures = {
+            self._pool.submit(self.capture_snapshot, name, timeout): name
+            for name in camera_names
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except CameraCaptureError as e:
+                results[name] = f"Error: {e}"
         return results
+
+    def close(self) -> None:
+        """Release the snapshot worker threads and ffmpeg readers."""
+        self._pool.shutdown(wait=False)
+        with self._readers_lock:
+            for reader in self._snapshot_readers.values():
+                reader.stop()
+            self._snapshot_readers.clear()
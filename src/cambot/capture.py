@@ -1,36 +1,182 @@
 """Shared stream capture layer — one ffmpeg/cv2 process per camera."""
 
+import heapq
+import itertools
 import logging
 import os
+import selectors
+import shutil
 import subprocess
 import threading
 import time
+from typing import TYPE_CHECKING, Callable, Iterator
 
-import cv2
 import numpy as np
 
+if TYPE_CHECKING:
+    import cv2
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    from turbojpeg import TJPF_BGR, TurboJPEG
+
+    _turbo = TurboJPEG()
+except (ImportError, OSError, RuntimeError):  # package or libturbojpeg missing
+    _turbo = None
+
 logger = logging.getLogger(__name__)
 
 _FFMPEG_CAPTURE_SIZE = (640, 480)
 
+# Larger than one bgr24 frame, so a frame is read in a syscall or two
+# instead of ~100 reads through the default 8KB buffer
+_PIPE_SIZE = 1 << 20
+
+# Shortest MjpegCapture.get_jpeg wait whose timeout counts as an ffmpeg stall
+_MIN_STALL_WAIT = 1.0
+
+
+def _grow_pipe(fd: int) -> None:
+    """Enlarge the kernel pipe buffer so ffmpeg doesn't stall mid-frame (Linux only)."""
+    setpipe = getattr(fcntl, "F_SETPIPE_SZ", None) if fcntl else None
+    if setpipe is None:
+        return
+    try:
+        fcntl.fcntl(fd, setpipe, _PIPE_SIZE)
+    except OSError:
+        pass  # above /proc/sys/fs/pipe-max-size for unprivileged users
+
+
+def encode_jpeg(frame: np.ndarray, quality: int = 90) -> bytes:
+    """Encode a BGR frame as JPEG, using libjpeg-turbo when available."""
+    if _turbo is not None:
+        return _turbo.encode(frame, quality=quality, pixel_format=TJPF_BGR)
+    import cv2  # deferred: only needed without libjpeg-turbo
+
+    _, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return jpeg.tobytes()
+
+
+def _tune_capture_thread() -> None:
+    """Run the calling capture thread as SCHED_BATCH, optionally pinned.
+
+    Capture is I/O-bound and tolerates latency, so it should yield to the
+    agent and YOLO inference. CAMBOT_CAPTURE_CPUS (e.g. "0,1") pins capture
+    threads to those cores, away from the ones inference runs on. Linux
+    only; silently skipped where unsupported or not permitted.
+    """
+    try:
+        os.sched_setscheduler(0, os.SCHED_BATCH, os.sched_param(0))
+    except (AttributeError, OSError):
+        pass
+    cpus = os.environ.get("CAMBOT_CAPTURE_CPUS")
+    if cpus:
+        try:
+            os.sched_setaffinity(0, {int(c) for c in cpus.split(",")})
+        except (AttributeError, OSError, ValueError) as e:
+            logger.warning("capture: cannot pin to CPUs %r: %s", cpus, e)
+
+
+_JPEG_SOI = b"\xff\xd8"
+_JPEG_EOI = b"\xff\xd9"
+
+
+def _iter_jpegs(pipe) -> Iterator[bytes]:
+    """Split an MJPEG byte stream into complete JPEG images (SOI..EOI)."""
+    buf = bytearray()
+    scan = 0  # where to resume looking for EOI
+    while True:
+        chunk = pipe.read1(65536)
+        if not chunk:
+            return
+        buf += chunk
+        while True:
+            start = buf.find(_JPEG_SOI)
+            if start < 0:
+                del buf[:-1]  # keep a possible partial marker
+                scan = 0
+                break
+            if start:
+                del buf[:start]
+                scan = 0
+            end = buf.find(_JPEG_EOI, max(scan, 2))
+            if end < 0:
+                scan = max(len(buf) - 1, 2)
+                break
+            yield bytes(buf[:end + 2])
+            del buf[:end + 2]
+            scan = 0
+
 
 class _PipeReader:
-    """Reads raw BGR frames from an ffmpeg subprocess pipe."""
+    """Reads raw BGR frames from an ffmpeg subprocess pipe as data arrives.
+
+    ``bufs`` lets the caller keep its frame buffers across reconnects;
+    reading starts with ``bufs[first]``.
+
+    If ffmpeg also writes MJPEG to ``jpeg_pipe``, a thread drains it and
+    passes each image to ``on_jpeg``, so that output never stalls ffmpeg.
+    """
 
-    def __init__(self, proc: subprocess.Popen, width: int, height: int):
+    def __init__(
+        self,
+        proc: subprocess.Popen,
+        width: int,
+        height: int,
+        bufs: list[np.ndarray] | None = None,
+        first: int = 0,
+        jpeg_pipe=None,
+        on_jpeg=None,
+    ):
         self._proc = proc
         self._width = width
         self._height = height
         self._frame_size = width * height * 3
+        # Two preallocated frames, filled alternately. The frame returned by
+        # read() stays intact while the next one is read into the other
+        # buffer, so it can be published without copying.
+        if bufs is None:
+            bufs = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(2)]
+        self._bufs = bufs
+        self._views = [memoryview(buf).cast("B") for buf in self._bufs]
+        self._idx = first
+        self._got = 0  # bytes of the current frame read so far
+        self._fd = proc.stdout.fileno()
+        os.set_blocking(self._fd, False)
+        if jpeg_pipe is not None:
+            threading.Thread(
+                target=self._drain_jpegs, args=(jpeg_pipe, on_jpeg),
+                daemon=True, name="capture-jpeg",
+            ).start()
+
+    def fileno(self) -> int:
+        return self._fd
 
     def read(self) -> tuple[bool, np.ndarray | None]:
-        data = self._proc.stdout.read(self._frame_size)
-        if not data or len(data) != self._frame_size:
+        """Read whatever the pipe holds, without blocking.
+
+        Returns (False, None) at EOF, (True, None) while the current frame
+        is still incomplete and (True, frame) once it has fully arrived.
+        """
+        try:
+            n = os.readv(self._fd, [self._views[self._idx][self._got:]])
+        except BlockingIOError:
+            return True, None
+        except OSError:
             return False, None
-        frame = np.frombuffer(data, dtype=np.uint8).reshape(
-            (self._height, self._width, 3)
-        )
-        return True, frame.copy()
+        if not n:
+            return False, None
+        self._got += n
+        if self._got < self._frame_size:
+            return True, None
+        self._got = 0
+        frame = self._bufs[self._idx]
+        self._idx ^= 1
+        return True, frame
 
     def release(self):
         try:
@@ -46,14 +192,134 @@ class _PipeReader:
             except Exception:
                 pass
 
+    @staticmethod
+    def _drain_jpegs(pipe, on_jpeg) -> None:
+        # Ends at EOF once release() has stopped ffmpeg
+        _tune_capture_thread()
+        with pipe:
+            try:
+                for jpeg in _iter_jpegs(pipe):
+                    on_jpeg(jpeg)
+            except (OSError, ValueError):
+                pass
+
+
+class _Cv2Reader:
+    """Paces a cv2.VideoCapture to the target fps without sleeping.
+
+    Every packet is grabbed so the stream stays live, and with the FFmpeg
+    backend grab() also decodes it; only one frame per interval is then
+    retrieved, which saves the BGR conversion and copy, not the decode.
+    """
+
+    def __init__(self, cap: "cv2.VideoCapture", fps: int):
+        self._cap = cap
+        self._interval = 1.0 / fps
+        self._next = 0.0
+
+    def read(self) -> tuple[bool, np.ndarray | None]:
+        while True:
+            if not self._cap.grab():
+                return False, None
+            now = time.monotonic()
+            if now >= self._next:
+                self._next = now + self._interval
+                return self._cap.retrieve()
+
+    def release(self):
+        self._cap.release()
+
+
+class _CaptureReactor:
+    """
+    One thread that reads every StreamCapture's ffmpeg pipe.
+
+    Pipes are non-blocking and multiplexed with a selector (epoll on Linux),
+    so the thread count no longer grows with the number of cameras.
+    Reconnect delays run as timers on the same thread.
+    """
+
+    _instance: "_CaptureReactor | None" = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> "_CaptureReactor":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()  # guards _timers
+        self._timers: list[tuple[float, int, Callable[[], None]]] = []
+        self._timer_ids = itertools.count()  # tie-breaker for equal deadlines
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        threading.Thread(target=self._run, daemon=True, name="capture-reactor").start()
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        """Run ``callback`` on the reactor thread after ``delay`` seconds."""
+        with self._lock:
+            heapq.heappush(
+                self._timers, (time.monotonic() + delay, next(self._timer_ids), callback),
+            )
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            pass  # a wakeup is already pending
+
+    def add_reader(self, fd: int, callback: Callable[[], None]) -> None:
+        """Call ``callback`` whenever ``fd`` is readable (reactor thread only)."""
+        self._selector.register(fd, selectors.EVENT_READ, callback)
+
+    def remove_reader(self, fd: int) -> None:
+        self._selector.unregister(fd)
+
+    def _run(self) -> None:
+        _tune_capture_thread()
+        while True:
+            with self._lock:
+                timeout = None
+                if self._timers:
+                    timeout = max(self._timers[0][0] - time.monotonic(), 0)
+            for key, _ in self._selector.select(timeout):
+                if key.data is None:
+                    try:
+                        os.read(self._wake_r, 4096)
+                    except BlockingIOError:
+                        pass
+                    continue
+                self._dispatch(key.data)
+
+            now = time.monotonic()
+            due = []
+            with self._lock:
+                while self._timers and self._timers[0][0] <= now:
+                    due.append(heapq.heappop(self._timers)[2])
+            for callback in due:
+                self._dispatch(callback)
+
+    @staticmethod
+    def _dispatch(callback: Callable[[], None]) -> None:
+        try:
+            callback()
+        except Exception:
+            logger.exception("capture: reactor callback failed")
+
 
 class StreamCapture:
     """
     Owns the video stream for a single camera.
 
-    Continuously reads frames in a background thread and keeps the latest
-    one available.  Both the motion detector and snapshot capture read from
-    this single instance, avoiding UDP port conflicts on SDP/SRTP streams.
+    Continuously reads frames and keeps the latest one available.  Both the
+    motion detector and snapshot capture read from this single instance,
+    avoiding UDP port conflicts on SDP/SRTP streams.
+
+    ffmpeg pipes are read by the shared _CaptureReactor thread; only the
+    cv2 fallback (no ffmpeg on PATH) gets a thread of its own.
     """
 
     def __init__(
@@ -62,6 +328,8 @@ class StreamCapture:
         sdp_file: str | None = None,
         rtsp_url: str | None = None,
         fps: int = 2,
+        capture_size: tuple[int, int] = _FFMPEG_CAPTURE_SIZE,
+        mjpeg_quality: int | None = None,
         reconnect_delay: int = 5,
         max_reconnect_delay: int = 60,
     ):
@@ -69,12 +337,22 @@ class StreamCapture:
         self.sdp_file = sdp_file
         self.rtsp_url = rtsp_url
         self._fps = fps
+        self._capture_size = capture_size
+        # When set, ffmpeg also emits native-resolution JPEGs at this -q:v
+        # and get_jpeg serves those instead of encoding in Python
+        self._mjpeg_quality = mjpeg_quality
+        self._ffmpeg_jpeg: bytes | None = None
+        # Pipe frame buffers, allocated on first connect and kept across
+        # reconnects instead of reallocating them for every ffmpeg process
+        self._frame_bufs: list[np.ndarray] | None = None
         self._reconnect_delay = reconnect_delay
         self._max_reconnect_delay = max_reconnect_delay
 
-        # Frame storage — protected by _lock
-        self._lock = threading.Lock()
-        self._latest_frame: np.ndarray | None = None
+        # Latest frame and its sequence number, published as one tuple by the
+        # capture thread; readers copy without locking (see _copy_latest)
+        self._latest: tuple[int, np.ndarray | None] = (0, None)
+        self._lock = threading.Lock()  # guards _jpeg_cache
+        self._jpeg_cache: dict[tuple[int, int], bytes] = {}  # (seq, quality) -> jpeg
         self._frame_event = threading.Event()  # set once first frame arrives
 
         # Lifecycle
@@ -82,12 +360,26 @@ class StreamCapture:
         self._thread: threading.Thread | None = None
         self._connected = threading.Event()
 
+        # Reactor-driven pipe state, only touched on the reactor thread
+        self._reactor: _CaptureReactor | None = None
+        self._reader: _PipeReader | None = None
+        self._delay = reconnect_delay
+
     @property
     def is_connected(self) -> bool:
         return self._connected.is_set()
 
+    @property
+    def frame_seq(self) -> int:
+        """Sequence number of the latest frame; bumps once per new frame."""
+        return self._latest[0]
+
     def start(self) -> None:
         self._stop_event.clear()
+        if self.sdp_file or shutil.which("ffmpeg"):
+            self._reactor = _CaptureReactor.get()
+            self._reactor.call_later(0, self._connect)
+            return
         self._thread = threading.Thread(
             target=self._capture_loop,
             daemon=True,
@@ -98,23 +390,59 @@ class StreamCapture:
     def stop(self) -> None:
         self._stop_event.set()
         self._frame_event.set()  # unblock waiters
+        if self._reactor is not None:
+            self._reactor.call_later(0, self._disconnect)
 
     def get_frame(self, timeout: float = 5.0) -> np.ndarray | None:
         """Return a copy of the latest raw BGR frame, or None."""
-        if self._latest_frame is not None:
-            with self._lock:
-                return self._latest_frame.copy() if self._latest_frame is not None else None
-        self._frame_event.wait(timeout=timeout)
-        with self._lock:
-            return self._latest_frame.copy() if self._latest_frame is not None else None
+        return self._copy_latest(timeout)[0]
 
-    def get_jpeg(self, quality: int = 90, timeout: float = 5.0) -> bytes | None:
-        """Return the latest frame encoded as JPEG bytes, or None."""
-        frame = self.get_frame(timeout=timeout)
+    def get_frame_view(self, timeout: float = 5.0) -> tuple[int, np.ndarray | None]:
+        """Return the latest frame's sequence number and a read-only view of it.
+
+        No copy is made: the capture buffer behind the view is refilled one
+        frame interval later.  Anything copied out of the view is only
+        intact if frame_seq still equals the returned seq after the copy.
+        The view is None if no frame arrived within timeout.
+        """
+        if self._latest[1] is None:
+            self._frame_event.wait(timeout=timeout)
+        seq, frame = self._latest
         if frame is None:
-            return None
-        _, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
-        return jpeg.tobytes()
+            return seq, None
+        view = frame.view()
+        view.flags.writeable = False
+        return seq, view
+
+    def get_jpeg(self, quality: int = 90, timeout: float = 5.0) -> bytes | None:
+        """Return the latest frame encoded as JPEG bytes, or None.
+
+        Encodes straight from the capture buffer, without copying it first.
+        Repeated calls between two frames return the cached encoding.
+        """
+        if self._latest[1] is None:
+            self._frame_event.wait(timeout=timeout)
+        jpeg = self._ffmpeg_jpeg
+        if jpeg is not None:
+            return jpeg
+        while True:
+            seq, frame = self._latest
+            if frame is None:
+                return None
+            key = (seq, quality)
+            with self._lock:
+                jpeg = self._jpeg_cache.get(key)
+            if jpeg is not None:
+                return jpeg
+            jpeg = encode_jpeg(frame, quality)
+            # Same check as _copy_latest: the buffer may have been refilled
+            if self._latest[0] != seq:
+                continue
+            with self._lock:
+                self._jpeg_cache[key] = jpeg
+                if len(self._jpeg_cache) > 2:
+                    del self._jpeg_cache[next(iter(self._jpeg_cache))]
+            return jpeg
 
     def wait_for_frame(self, timeout: float = 10.0) -> bool:
         """Block until at least one frame has been captured."""
@@ -124,11 +452,83 @@ class StreamCapture:
     # Internal
     # ------------------------------------------------------------------
 
+    def _copy_latest(self, timeout: float) -> tuple[np.ndarray | None, int]:
+        """Copy the latest frame along with its sequence number.
+
+        Seqlock-style: the copy is taken without blocking the producer and
+        retried if a newer frame was published meanwhile, since the producer
+        may then be refilling the buffer being copied.
+        """
+        if self._latest[1] is None:
+            self._frame_event.wait(timeout=timeout)
+        while True:
+            seq, frame = self._latest
+            if frame is None:
+                return None, seq
+            copy = frame.copy()
+            if self._latest[0] == seq:
+                return copy, seq
+
+    def _publish(self, frame: np.ndarray) -> None:
+        # Pipe frames live in _PipeReader's double buffer: the one published
+        # here is not written again until the next frame has been published,
+        # which _copy_latest checks for. A single reference assignment is
+        # atomic under the GIL.
+        self._latest = (self._latest[0] + 1, frame)
+        self._frame_event.set()
+
+    # ---- ffmpeg pipe, on the reactor thread ----
+
+    def _connect(self) -> None:
+        if self._stop_event.is_set() or self._reader is not None:
+            return
+        reader = self._open_ffmpeg_pipe(self._ffmpeg_input())
+        if reader is None:
+            self._retry("failed to open stream")
+            return
+        logger.info("capture/%s: stream connected", self.camera_name)
+        self._connected.set()
+        self._reader = reader
+        self._reactor.add_reader(reader.fileno(), self._on_readable)
+
+    def _on_readable(self) -> None:
+        reader = self._reader
+        if reader is None:
+            return
+        ok, frame = reader.read()
+        if frame is not None:
+            self._delay = self._reconnect_delay
+            self._publish(frame)
+        elif not ok:
+            self._disconnect()
+            if not self._stop_event.is_set():
+                self._retry("stream ended")
+
+    def _disconnect(self) -> None:
+        reader = self._reader
+        if reader is None:
+            return
+        self._reader = None
+        self._reactor.remove_reader(reader.fileno())
+        reader.release()
+        self._connected.clear()
+        self._ffmpeg_jpeg = None
+
+    def _retry(self, reason: str) -> None:
+        logger.warning(
+            "capture/%s: %s, retrying in %ds", self.camera_name, reason, self._delay,
+        )
+        self._reactor.call_later(self._delay, self._connect)
+        self._delay = min(self._delay * 2, self._max_reconnect_delay)
+
+    # ---- cv2 fallback, on its own thread ----
+
     def _capture_loop(self) -> None:
+        _tune_capture_thread()
         delay = self._reconnect_delay
 
         while not self._stop_event.is_set():
-            cap = self._open_stream()
+            cap = self._open_cv2()
             if cap is None:
                 logger.warning(
                     "capture/%s: failed to open stream, retrying in %ds",
@@ -142,8 +542,6 @@ class StreamCapture:
             logger.info("capture/%s: stream connected", self.camera_name)
             self._connected.set()
             delay = self._reconnect_delay
-            is_pipe = isinstance(cap, _PipeReader)
-            frame_interval = 1.0 / self._fps
             consecutive_failures = 0
             max_failures = 30
 
@@ -158,34 +556,29 @@ class StreamCapture:
                                 self.camera_name, consecutive_failures,
                             )
                             break
-                        if not is_pipe:
-                            time.sleep(frame_interval)
+                        # A failed grab returns at once; don't spin on it
+                        self._stop_event.wait(0.1)
                         continue
 
                     consecutive_failures = 0
-                    with self._lock:
-                        self._latest_frame = frame
-                    self._frame_event.set()
-
-                    if not is_pipe:
-                        time.sleep(frame_interval)
+                    self._publish(frame)
             finally:
                 cap.release()
                 self._connected.clear()
 
-    def _open_stream(self):
+    # ---- Stream setup ----
+
+    def _ffmpeg_input(self) -> list[str]:
         if self.sdp_file:
-            return self._open_ffmpeg_pipe()
-        if self.rtsp_url:
-            return self._open_cv2()
-        return None
+            return ["-protocol_whitelist", "file,udp,srtp,rtp", "-i", self.sdp_file]
+        return ["-rtsp_transport", "tcp", "-i", self.rtsp_url]
 
-    def _open_ffmpeg_pipe(self) -> _PipeReader | None:
-        w, h = _FFMPEG_CAPTURE_SIZE
+    def _open_ffmpeg_pipe(self, input_args: list[str]) -> _PipeReader | None:
+        # ffmpeg drops frames to the target rate with -r before they reach us
+        w, h = self._capture_size
         cmd = [
             "ffmpeg",
-            "-protocol_whitelist", "file,udp,srtp,rtp",
-            "-i", self.sdp_file,
+            *input_args,
             "-f", "rawvideo",
             "-pix_fmt", "bgr24",
             "-s", f"{w}x{h}",
@@ -193,23 +586,263 @@ class StreamCapture:
             "-loglevel", "warning",
             "pipe:1",
         ]
+        jpeg_r = jpeg_w = None
+        if self._mjpeg_quality is not None:
+            # Second output on an extra fd, encoded by ffmpeg's mjpeg encoder
+            jpeg_r, jpeg_w = os.pipe()
+            cmd[-1:-1] = ["-map", "0:v"]
+            cmd += [
+                "-map", "0:v",
+                "-c:v", "mjpeg",
+                "-q:v", str(self._mjpeg_quality),
+                "-r", str(self._fps),
+                "-f", "mjpeg",
+                f"pipe:{jpeg_w}",
+            ]
         try:
             proc = subprocess.Popen(
                 cmd,
                 stdin=subprocess.DEVNULL,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.DEVNULL,
+                bufsize=_PIPE_SIZE,
+                pass_fds=(jpeg_w,) if jpeg_w is not None else (),
             )
-            return _PipeReader(proc, w, h)
         except Exception as e:
             logger.warning("capture/%s: ffmpeg start failed: %s", self.camera_name, e)
+            if jpeg_r is not None:
+                os.close(jpeg_r)
+            return None
+        finally:
+            if jpeg_w is not None:
+                os.close(jpeg_w)
+        _grow_pipe(proc.stdout.fileno())
+        if self._frame_bufs is None:
+            self._frame_bufs = [np.empty((h, w, 3), dtype=np.uint8) for _ in range(2)]
+        # Never start by overwriting the frame still published from the
+        # previous connection
+        first = 1 if self._latest[1] is self._frame_bufs[0] else 0
+        if jpeg_r is None:
+            return _PipeReader(proc, w, h, self._frame_bufs, first)
+        return _PipeReader(
+            proc, w, h, self._frame_bufs, first,
+            jpeg_pipe=os.fdopen(jpeg_r, "rb"),
+            on_jpeg=self._set_ffmpeg_jpeg,
+        )
+
+    def _set_ffmpeg_jpeg(self, jpeg: bytes) -> None:
+        self._ffmpeg_jpeg = jpeg
+
+    def _open_cv2(self) -> _Cv2Reader | None:
+        if not self.rtsp_url:
             return None
+        import cv2
 
-    def _open_cv2(self) -> cv2.VideoCapture | None:
-        os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "loglevel;quiet"
+        # CAP_PROP_BUFFERSIZE only bounds the demuxer queue; these make the
+        # decoder itself hand over frames as soon as they arrive
+        os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = (
+            "loglevel;quiet|rtsp_transport;tcp|fflags;nobuffer+discardcorrupt"
+            "|flags;low_delay|probesize;32|analyzeduration;0|max_delay;0"
+        )
         cap = cv2.VideoCapture(self.rtsp_url, cv2.CAP_FFMPEG)
         cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         if not cap.isOpened():
             logger.warning("capture/%s: VideoCapture failed to open", self.camera_name)
             return None
-        return cap
+        return _Cv2Reader(cap, self._fps)
+
+
+class MjpegCapture:
+    """
+    Keeps one ffmpeg process per RTSP camera encoding the stream to MJPEG.
+
+    Snapshots are taken from the running process instead of opening a new
+    RTSP session each time, so a capture costs one frame interval rather
+    than a handshake plus keyframe wait.  ffmpeg is stopped after
+    idle_timeout seconds without a get_jpeg call and restarted by the next.
+    """
+
+    def __init__(
+        self,
+        camera_name: str,
+        rtsp_url: str,
+        quality: int = 2,
+        fps: int = 2,
+        codec: str | None = None,
+        reconnect_delay: int = 5,
+        max_reconnect_delay: int = 60,
+        idle_timeout: float | None = 30.0,
+    ):
+        self.camera_name = camera_name
+        self.rtsp_url = rtsp_url
+        self._quality = quality
+        self._codec = codec
+        self._fps = fps
+        self._reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+
+        # Latest JPEG and its sequence number — protected by _cond
+        self._cond = threading.Condition()
+        self._latest_jpeg: bytes | None = None
+        self._seq = 0
+
+        # Lifecycle
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._connected = threading.Event()
+        self._proc: subprocess.Popen | None = None
+
+        # Idle shutdown: _wake restarts a paused capture loop
+        self._idle_timeout = idle_timeout
+        self._idle_lock = threading.Lock()
+        self._last_get = time.monotonic()
+        self._idle = False
+        self._wake = threading.Event()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected.is_set()
+
+    @property
+    def is_idle(self) -> bool:
+        """True while ffmpeg is stopped for lack of consumers."""
+        return self._idle
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        self._last_get = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._capture_loop,
+            daemon=True,
+            name=f"mjpeg-{self.camera_name}",
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake.set()
+        self._kill()
+        with self._cond:
+            self._cond.notify_all()
+
+    def get_jpeg(self, timeout: float = 5.0) -> bytes | None:
+        """Wait for the next JPEG produced after this call, or None on timeout.
+
+        A timeout while connected means ffmpeg stalled, so the process is
+        killed and the capture loop reconnects.  Waits shorter than a frame
+        interval or _MIN_STALL_WAIT prove nothing and never kill it.
+        """
+        self._touch()
+        with self._cond:
+            seq = self._seq
+            self._cond.wait_for(
+                lambda: self._seq != seq or self._stop_event.is_set(),
+                timeout=timeout,
+            )
+            if self._seq != seq:
+                return self._latest_jpeg
+        if self.is_connected and timeout >= max(_MIN_STALL_WAIT, 1.0 / self._fps):
+            logger.warning("mjpeg/%s: no frame in %ss, restarting ffmpeg", self.camera_name, timeout)
+            self._kill()
+        return None
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _touch(self) -> None:
+        """Record a consumer, waking the capture loop if it was paused."""
+        with self._idle_lock:
+            self._last_get = time.monotonic()
+            wake, self._idle = self._idle, False
+        if wake:
+            logger.info("mjpeg/%s: consumer back, resuming stream", self.camera_name)
+            self._wake.set()
+
+    def _check_idle(self) -> bool:
+        """Mark the reader idle once nobody has asked for a JPEG in a while."""
+        if self._idle_timeout is None:
+            return False
+        with self._idle_lock:
+            if time.monotonic() - self._last_get < self._idle_timeout:
+                return False
+            self._wake.clear()
+            self._idle = True
+        logger.info("mjpeg/%s: no consumers for %ss, pausing stream",
+                    self.camera_name, self._idle_timeout)
+        return True
+
+    def _capture_loop(self) -> None:
+        _tune_capture_thread()
+        delay = self._reconnect_delay
+
+        while not self._stop_event.is_set():
+            paused = False
+            proc = self._spawn()
+            if proc is None:
+                self._stop_event.wait(timeout=delay)
+                delay = min(delay * 2, self._max_reconnect_delay)
+                continue
+
+            self._proc = proc
+            try:
+                for jpeg in _iter_jpegs(proc.stdout):
+                    if not self._connected.is_set():
+                        logger.info("mjpeg/%s: stream connected", self.camera_name)
+                        self._connected.set()
+                        delay = self._reconnect_delay
+                    with self._cond:
+                        self._latest_jpeg = jpeg
+                        self._seq += 1
+                        self._cond.notify_all()
+                    if self._stop_event.is_set():
+                        break
+                    if self._check_idle():
+                        paused = True
+                        break
+            except (OSError, ValueError):
+                pass  # pipe closed by _kill()
+            finally:
+                self._connected.clear()
+                self._kill()
+                self._proc = None
+
+            if paused:
+                self._wake.wait()
+                delay = self._reconnect_delay
+            elif not self._stop_event.is_set():
+                logger.warning(
+                    "mjpeg/%s: stream ended, reconnecting in %ds",
+                    self.camera_name, delay,
+                )
+                self._stop_event.wait(timeout=delay)
+                delay = min(delay * 2, self._max_reconnect_delay)
+
+    def _spawn(self) -> subprocess.Popen | None:
+        cmd = ["ffmpeg", "-rtsp_transport", "tcp", "-i", self.rtsp_url]
+        if self._codec == "mjpeg":
+            # Source frames are already JPEG — forward them without re-encoding
+            cmd += ["-c:v", "copy", "-bsf:v", "mjpeg2jpeg"]
+        else:
+            cmd += ["-vcodec", "mjpeg", "-q:v", str(self._quality), "-r", str(self._fps)]
+        cmd += ["-f", "image2pipe", "-loglevel", "warning", "pipe:1"]
+        try:
+            return subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except Exception as e:
+            logger.warning("mjpeg/%s: ffmpeg start failed: %s", self.camera_name, e)
+            return None
+
+    def _kill(self) -> None:
+        proc = self._proc
+        if proc is None:
+            return
+        try:
+            proc.kill()
+            proc.wait(timeout=5)
+        except Exception:
+            pass
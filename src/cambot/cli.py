@@ -1,4 +1,5 @@
 import argparse
+import dataclasses
 import itertools
 import logging
 import os
@@ -17,22 +18,23 @@ logging.basicConfig(
 )
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
-from cambot.camera import CameraManager
-from cambot.agent import SecurityAgent
-from cambot.config import load_cameras_config
-
 
 class Spinner:
     """Simple CLI spinner shown while the agent is thinking."""
 
     _FRAMES = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+    _INTERVAL = 0.1
 
     def __init__(self, message: str = "Thinking"):
         self._message = message
+        self._frames = itertools.cycle(self._FRAMES)
         self._stop = threading.Event()
         self._thread: threading.Thread | None = None
 
     def __enter__(self):
+        # Redraws run on a thread rather than from a SIGALRM handler: writing
+        # to stderr inside a signal handler can re-enter a logging write
+        self._tick()
         self._stop.clear()
         self._thread = threading.Thread(target=self._spin, daemon=True)
         self._thread.start()
@@ -42,32 +44,59 @@ class Spinner:
         self._stop.set()
         if self._thread:
             self._thread.join()
+            self._thread = None
         sys.stderr.write("\r\033[K")
         sys.stderr.flush()
 
+    def _tick(self):
+        sys.stderr.write(f"\r{next(self._frames)} {self._message}...")
+        sys.stderr.flush()
+
     def _spin(self):
-        for frame in itertools.cycle(self._FRAMES):
-            if self._stop.is_set():
-                break
-            sys.stderr.write(f"\r{frame} {self._message}...")
-            sys.stderr.flush()
-            self._stop.wait(0.1)
+        while not self._stop.wait(self._INTERVAL):
+            self._tick()
+
+
+def _motion_cameras(config: dict) -> list[dict]:
+    """Config entries of the enabled cameras that have motion detection on."""
+    return [
+        cam_cfg for cam_cfg in config.get("cameras", [])
+        if cam_cfg.get("enabled", True) and cam_cfg.get("motion_detection", False)
+    ]
+
 
+def _motion_config(motion_settings: dict):
+    """Build the global MotionConfig from settings.motion.
 
-def _init_streams(config: dict) -> dict:
+    Keys missing from the YAML keep the MotionConfig defaults.
+    """
+    from cambot.motion import MotionConfig
+
+    values = {
+        f.name: motion_settings[f.name]
+        for f in dataclasses.fields(MotionConfig)
+        if f.name in motion_settings
+    }
+    if "resolution" in values:
+        values["resolution"] = tuple(values["resolution"])
+    return MotionConfig(**values)
+
+
+def _init_streams(config: dict, motion_cams: list[dict], motion_config) -> dict:
     """Create and start StreamCapture instances for motion-enabled cameras."""
     from cambot.capture import StreamCapture
 
-    motion_settings = config.get("settings", {}).get("motion", {})
-    fps = motion_settings.get("fps", 2)
+    settings = config.get("settings", {})
+    motion_settings = settings.get("motion", {})
+    # Set equal to motion.resolution to have ffmpeg do the motion downscale
+    capture_size = tuple(motion_settings.get("capture_resolution", [640, 480]))
+    # Optionally have ffmpeg encode snapshots alongside the raw frames
+    mjpeg_quality = None
+    if motion_settings.get("ffmpeg_jpeg", False):
+        mjpeg_quality = settings.get("snapshot_quality", 2)
 
     streams = {}
-    for cam_cfg in config.get("cameras", []):
-        if not cam_cfg.get("enabled", True):
-            continue
-        if not cam_cfg.get("motion_detection", False):
-            continue
-
+    for cam_cfg in motion_cams:
         name = cam_cfg["name"]
         sdp_file = cam_cfg.get("sdp_file")
         rtsp_url = cam_cfg.get("rtsp_url")
@@ -78,7 +107,9 @@ def _init_streams(config: dict) -> dict:
             camera_name=name,
             sdp_file=sdp_file,
             rtsp_url=rtsp_url,
-            fps=fps,
+            fps=motion_config.fps,
+            capture_size=capture_size,
+            mjpeg_quality=mjpeg_quality,
         )
         stream.start()
         streams[name] = stream
@@ -86,41 +117,22 @@ def _init_streams(config: dict) -> dict:
     return streams
 
 
-def _init_motion(config: dict, camera_manager, streams: dict | None = None):
-    """Build a MotionDetectorManager from cameras.yaml config, or return None."""
+# Motion settings a camera may override in its motion_config block
+_CAMERA_MOTION_OVERRIDES = ("threshold", "cooldown", "fps")
+
+
+def _init_motion(motion_cams: list[dict], global_config, streams: dict | None = None):
+    """Build a MotionDetectorManager for the motion-enabled cameras, or return None."""
     from cambot.motion import MotionConfig, MotionDetectorManager
 
-    motion_settings = config.get("settings", {}).get("motion", {})
-    if not motion_settings.get("enabled", False):
+    if not global_config.enabled or not motion_cams:
         return None
 
-    global_config = MotionConfig(
-        enabled=True,
-        threshold=motion_settings.get("threshold", 1.0),
-        cooldown=motion_settings.get("cooldown", 60),
-        fps=motion_settings.get("fps", 2),
-        resolution=tuple(motion_settings.get("resolution", [320, 240])),
-        min_contour_area=motion_settings.get("min_contour_area", 500),
-        warmup_frames=motion_settings.get("warmup_frames", 30),
-        history=motion_settings.get("history", 500),
-        var_threshold=motion_settings.get("var_threshold", 16),
-        reconnect_delay=motion_settings.get("reconnect_delay", 5),
-        max_reconnect_delay=motion_settings.get("max_reconnect_delay", 60),
-        person_detection=motion_settings.get("person_detection", True),
-        person_confidence=motion_settings.get("person_confidence", 0.4),
-        yolo_model=motion_settings.get("yolo_model", "yolov8n"),
-    )
-
     # Build per-camera configs and camera info dict
     per_camera_configs: dict[str, MotionConfig] = {}
     cameras_info: dict[str, dict] = {}
 
-    for cam_cfg in config.get("cameras", []):
-        if not cam_cfg.get("enabled", True):
-            continue
-        if not cam_cfg.get("motion_detection", False):
-            continue
-
+    for cam_cfg in motion_cams:
         name = cam_cfg["name"]
         cameras_info[name] = {
             "rtsp_url": cam_cfg.get("rtsp_url"),
@@ -129,32 +141,25 @@ def _init_motion(config: dict, camera_manager, streams: dict | None = None):
         }
 
         cam_motion = cam_cfg.get("motion_config", {})
-        if cam_motion:
-            per_camera_configs[name] = MotionConfig(
-                enabled=True,
-                threshold=cam_motion.get("threshold", global_config.threshold),
-                cooldown=cam_motion.get("cooldown", global_config.cooldown),
-                fps=cam_motion.get("fps", global_config.fps),
-                resolution=global_config.resolution,
-                min_contour_area=global_config.min_contour_area,
-                warmup_frames=global_config.warmup_frames,
-                history=global_config.history,
-                var_threshold=global_config.var_threshold,
-                reconnect_delay=global_config.reconnect_delay,
-                max_reconnect_delay=global_config.max_reconnect_delay,
-                person_detection=global_config.person_detection,
-                person_confidence=global_config.person_confidence,
-                yolo_model=global_config.yolo_model,
-            )
-
-    if not cameras_info:
-        return None
+        overrides = {k: cam_motion[k] for k in _CAMERA_MOTION_OVERRIDES if k in cam_motion}
+        if overrides:
+            per_camera_configs[name] = dataclasses.replace(global_config, **overrides)
 
     return MotionDetectorManager(
         cameras_info, global_config, per_camera_configs, streams=streams,
     )
 
 
+def _read_piped_line(prompt: str) -> str:
+    """input() without readline, for stdin that is not a terminal."""
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line
+
+
 def _save_photos(photos: list[tuple[bytes, str]]) -> None:
     """Save photos to temp dir and print paths."""
     if not photos:
@@ -178,7 +183,13 @@ def main():
     parser.add_argument("--no-motion", action="store_true", help="Disable motion detection even if configured")
     args = parser.parse_args()
 
+    # Imported after argument parsing so --help and usage errors stay fast
     from pathlib import Path
+
+    from cambot.agent import SecurityAgent
+    from cambot.camera import CameraManager
+    from cambot.config import load_cameras_config
+
     config_path = Path(args.config) if args.config else None
     try:
         config = load_cameras_config(config_path)
@@ -189,8 +200,12 @@ def main():
 
     # Create shared stream captures for motion-enabled cameras
     streams = {}
+    motion_cams: list[dict] = []
+    motion_config = None
     if not args.no_motion:
-        streams = _init_streams(config)
+        motion_cams = _motion_cameras(config)
+        motion_config = _motion_config(config.get("settings", {}).get("motion", {}))
+        streams = _init_streams(config, motion_cams, motion_config)
         camera_manager.set_streams(streams)
 
     model = args.model or config.get("settings", {}).get("model", "claude-sonnet-4-5-20250929")
@@ -202,7 +217,7 @@ def main():
     # Motion detection setup
     motion_detector = None
     if not args.no_motion:
-        motion_detector = _init_motion(config, camera_manager, streams)
+        motion_detector = _init_motion(motion_cams, motion_config, streams)
 
     if args.telegram:
         from cambot.telegram import TelegramBot
@@ -275,9 +290,11 @@ def main():
             except Exception as e:
                 print(f"(Could not load memory summary: {e})\n", file=sys.stderr)
 
+        # Keep readline line editing for terminals only
+        read_line = input if sys.stdin.isatty() else _read_piped_line
         while True:
             try:
-                user_input = input("You: ").strip()
+                user_input = read_line("You: ").strip()
             except (KeyboardInterrupt, EOFError):
                 print("\nGoodbye!")
                 break
@@ -1,12 +1,24 @@
+import copy
+import json
+import os
+import stat
 from pathlib import Path
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 CONFIG_DIR = PROJECT_ROOT / "config"
 DATA_DIR = PROJECT_ROOT / "data"
 CAMERAS_CONFIG_PATH = CONFIG_DIR / "cameras.yaml"
 
+# Validated configs by path, with the (st_mtime_ns, st_size) they were read at
+_CONFIG_CACHE: dict[Path, tuple[tuple[int, int], dict]] = {}
+
 
 def load_cameras_config(config_path: Path | None = None) -> dict:
     config_path = config_path or CAMERAS_CONFIG_PATH
@@ -16,8 +28,20 @@ def load_cameras_config(config_path: Path | None = None) -> dict:
             f"Copy config/cameras.yaml.example to config/cameras.yaml and fill in your camera details."
         )
 
+    st = config_path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _CONFIG_CACHE.get(config_path)
+    if cached is not None and cached[0] == stamp:
+        # Callers may modify their config, so never hand out the cached one
+        return copy.deepcopy(cached[1])
+
+    config = _read_json_sidecar(config_path, stamp)
+    if config is not None:
+        _CONFIG_CACHE[config_path] = (stamp, config)
+        return copy.deepcopy(config)
+
     with open(config_path) as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=_YamlLoader)
 
     if not config or "cameras" not in config:
         raise ValueError("cameras.yaml must contain a 'cameras' list")
@@ -38,4 +62,52 @@ def load_cameras_config(config_path: Path | None = None) -> dict:
                 f"Camera #{i} ({cam.get('name', '?')}): specify either 'rtsp_url' or 'sdp_file', not both"
             )
 
-    return config
+    _CONFIG_CACHE[config_path] = (stamp, config)
+    _write_json_sidecar(config_path, stamp, st.st_mode, config)
+    return copy.deepcopy(config)
+
+
+# ---- JSON sidecar ----
+# A validated config is also saved as <name>.cache.json next to the YAML,
+# tagged with the YAML's (st_mtime_ns, st_size). Later starts load that with
+# the C json parser instead of parsing YAML, until the YAML changes.
+
+
+def _sidecar_path(config_path: Path) -> Path:
+    return config_path.with_name(config_path.name + ".cache.json")
+
+
+def _read_json_sidecar(config_path: Path, stamp: tuple[int, int]) -> dict | None:
+    try:
+        with open(_sidecar_path(config_path)) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("source") != list(stamp):
+        return None
+    return data.get("config")
+
+
+def _write_json_sidecar(
+    config_path: Path, stamp: tuple[int, int], mode: int, config: dict,
+) -> None:
+    try:
+        text = json.dumps({"source": list(stamp), "config": config})
+    except (TypeError, ValueError):
+        return  # YAML-only types (dates, sets, ...)
+    # JSON turns tuples into lists and non-string keys into strings; only
+    # cache configs that come back unchanged
+    if json.loads(text)["config"] != config:
+        return
+    sidecar = _sidecar_path(config_path)
+    tmp = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+    try:
+        # The sidecar holds the same secrets as the YAML (RTSP credentials),
+        # so give it the YAML's permissions rather than the umask default
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, "w") as f:
+            os.fchmod(fd, stat.S_IMODE(mode))
+            f.write(text)
+        os.replace(tmp, sidecar)
+    except OSError:
+        tmp.unlink(missing_ok=True)  # read-only config dir: just skip the cache
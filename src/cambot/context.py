@@ -1,3 +1,7 @@
+import atexit
+import os
+import threading
+
 from cambot.config import DATA_DIR
 
 MEMORY_PATH = DATA_DIR / "memory.md"
@@ -8,21 +12,67 @@ class MemoryStore:
 
     def __init__(self):
         self._path = MEMORY_PATH
+        self._cache: tuple[int, str] | None = None  # (st_mtime_ns, text)
+        # Long-lived append handle, opened on first append — guarded by _lock
+        self._lock = threading.Lock()
+        self._fh = None
+        atexit.register(self.close)
+
+    @property
+    def path(self):
+        return self._path
 
     def read(self) -> str:
-        if not self._path.exists():
+        """Return the memory text, re-reading the file only when its mtime changes."""
+        try:
+            mtime = self._path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._cache = None
             return ""
-        return self._path.read_text().strip()
+        if self._cache is not None and self._cache[0] == mtime:
+            return self._cache[1]
+        text = self._path.read_text().strip()
+        self._cache = (mtime, text)
+        return text
 
     def append(self, content: str) -> None:
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-        with open(self._path, "a") as f:
-            f.write(content + "\n")
+        with self._lock:
+            if self._fh is not None and not self._handle_current():
+                # File was replaced or deleted behind our back: the handle
+                # would keep writing to the old inode
+                self._fh.close()
+                self._fh = None
+            if self._fh is None:
+                DATA_DIR.mkdir(parents=True, exist_ok=True)
+                self._fh = open(self._path, "a")
+            self._fh.write(content + "\n")
+            self._fh.flush()
+        self._cache = None
+
+    def close(self) -> None:
+        """Close the append handle; the next append reopens it."""
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def _handle_current(self) -> bool:
+        """Whether the append handle still refers to the file at path."""
+        try:
+            st = os.stat(self._path)
+        except FileNotFoundError:
+            return False
+        fst = os.fstat(self._fh.fileno())
+        return (st.st_ino, st.st_dev) == (fst.st_ino, fst.st_dev)
 
     def rewrite(self, content: str) -> None:
+        self.close()
         DATA_DIR.mkdir(parents=True, exist_ok=True)
         self._path.write_text(content + "\n")
+        self._cache = None
 
     def clear(self) -> None:
+        self.close()
         if self._path.exists():
             self._path.unlink()
+        self._cache = None
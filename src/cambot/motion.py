@@ -1,21 +1,30 @@
 """Motion detection + person counting using OpenCV MOG2 and YOLO."""
 
 import logging
+import os
 import queue
 import threading
 import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 
 import cv2
 import numpy as np
 
-from cambot.capture import StreamCapture
+from cambot.capture import StreamCapture, encode_jpeg
 
 logger = logging.getLogger(__name__)
 
+# YOLO requests from all cameras are batched into one model call
+_YOLO_MAX_BATCH = 8
+_YOLO_BATCH_WINDOW = 0.05  # seconds to wait for more frames after the first
+_YOLO_TIMEOUT = 30.0  # first call may include loading the model
 
-@dataclass
+
+@dataclass(slots=True)
 class MotionConfig:
     enabled: bool = False
     threshold: float = 1.0  # % of frame area that must change
@@ -31,9 +40,11 @@ class MotionConfig:
     person_detection: bool = True  # run YOLO when motion detected
     person_confidence: float = 0.4  # YOLO confidence threshold
     yolo_model: str = "yolov8n"  # model variant
+    yolo_precision: str = "fp32"  # "fp32" (.pt), or "fp16"/"int8" TensorRT engine
+    gpu: bool = False  # run MOG2 on CUDA when OpenCV is built with it
 
 
-@dataclass
+@dataclass(slots=True)
 class MotionEvent:
     camera_name: str
     timestamp: datetime
@@ -45,13 +56,75 @@ class MotionEvent:
     trigger: str = "motion"  # "motion", "person_change", or "both"
 
 
-@dataclass
+@dataclass(slots=True)
 class CameraState:
     person_count: int = 0
     last_person_change_at: datetime | None = None
     last_motion_at: datetime | None = None
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class _SceneArrays:
+    """Scene state of all cameras as parallel arrays, one row per camera.
+
+    Timestamps are UTC microseconds since the epoch, 0 meaning never.
+    """
+
+    def __init__(self, n: int):
+        self.person_count = np.zeros(n, dtype=np.int32)
+        self.last_person_change_us = np.zeros(n, dtype=np.int64)
+        self.last_motion_us = np.zeros(n, dtype=np.int64)
+
+
+def _from_us(us: int) -> datetime | None:
+    return _EPOCH + timedelta(microseconds=us) if us else None
+
+
+def _iso_column(us: np.ndarray) -> list[str | None]:
+    return [_from_us(t).isoformat() if t else None for t in us.tolist()]
+
+
+def _cuda_available() -> bool:
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+
+class _CudaMotionPipeline:
+    """Resize, MOG2, threshold and opening on the GPU.
+
+    Each frame costs one upload and the download of the small binary mask.
+    """
+
+    def __init__(self, config: MotionConfig, kernel):
+        self._size = config.resolution
+        self._bg_sub = cv2.cuda.createBackgroundSubtractorMOG2(
+            history=config.history,
+            varThreshold=config.var_threshold,
+            detectShadows=True,
+        )
+        self._open = cv2.cuda.createMorphologyFilter(cv2.MORPH_OPEN, cv2.CV_8UC1, kernel)
+        self._stream = cv2.cuda.Stream()
+        self._frame = cv2.cuda_GpuMat()
+
+    def apply(self, frame: np.ndarray, mask: np.ndarray | None) -> None:
+        """Feed a frame to MOG2; if ``mask`` is given, download the cleaned mask into it."""
+        self._frame.upload(frame, stream=self._stream)
+        small = cv2.cuda.resize(
+            self._frame, self._size, interpolation=cv2.INTER_NEAREST, stream=self._stream,
+        )
+        fg_mask = self._bg_sub.apply(small, -1.0, self._stream)
+        if mask is not None:
+            _, thresh = cv2.cuda.threshold(
+                fg_mask, 200, 255, cv2.THRESH_BINARY, stream=self._stream,
+            )
+            self._open.apply(thresh, stream=self._stream).download(self._stream, mask)
+        self._stream.waitForCompletion()
+
+
 class CameraMotionDetector:
     """Per-camera worker thread that detects motion and counts people."""
 
@@ -60,26 +133,42 @@ class CameraMotionDetector:
         camera_name: str,
         stream: StreamCapture,
         config: MotionConfig,
-        event_queue: queue.Queue,
+        publish,
         stop_event: threading.Event,
-        yolo_loader,
+        count_people,
+        scene: _SceneArrays | None = None,
+        row: int = 0,
     ):
         self.camera_name = camera_name
         self._stream = stream
         self.config = config
-        self._event_queue = event_queue
+        self._publish = publish
         self._stop_event = stop_event
-        self._yolo_loader = yolo_loader
+        self._count_people_fn = count_people
         self._enabled = threading.Event()
         if config.enabled:
             self._enabled.set()
-        self._last_event_time: float = 0
-        self._state = CameraState()
+        self._last_event_ns = 0  # time.time_ns() of the last emitted event
+        # This camera's row in the shared scene arrays
+        self._scene = scene if scene is not None else _SceneArrays(1)
+        self._row = row
         self._thread: threading.Thread | None = None
 
+        # Per-frame work buffers, reused instead of reallocated every frame
+        w, h = config.resolution
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self._small = np.empty((h, w, 3), dtype=np.uint8)
+        self._fg_mask = np.empty((h, w), dtype=np.uint8)
+        self._mask = np.empty((h, w), dtype=np.uint8)
+
     @property
     def state(self) -> CameraState:
-        return self._state
+        scene, row = self._scene, self._row
+        return CameraState(
+            person_count=int(scene.person_count[row]),
+            last_person_change_at=_from_us(int(scene.last_person_change_us[row])),
+            last_motion_at=_from_us(int(scene.last_motion_us[row])),
+        )
 
     @property
     def is_enabled(self) -> bool:
@@ -112,63 +201,106 @@ class CameraMotionDetector:
 
             logger.info("motion/%s: stream ready, starting detection", self.camera_name)
 
-            bg_sub = cv2.createBackgroundSubtractorMOG2(
-                history=self.config.history,
-                varThreshold=self.config.var_threshold,
-                detectShadows=True,
-            )
+            gpu = None
+            if self.config.gpu:
+                if _cuda_available():
+                    try:
+                        gpu = _CudaMotionPipeline(self.config, self._kernel)
+                    except cv2.error as e:
+                        logger.warning("motion/%s: CUDA setup failed, using CPU: %s", self.camera_name, e)
+                else:
+                    logger.warning("motion/%s: no CUDA device, using CPU", self.camera_name)
+            if gpu is None:
+                bg_sub = cv2.createBackgroundSubtractorMOG2(
+                    history=self.config.history,
+                    varThreshold=self.config.var_threshold,
+                    detectShadows=True,
+                )
             frame_count = 0
             frame_interval = 1.0 / self.config.fps
+            last_seq = -1
+            next_due = time.monotonic()
 
             while not self._stop_event.is_set() and self._enabled.is_set():
-                frame = self._stream.get_frame(timeout=frame_interval)
-                if frame is None:
+                # Pace against a deadline rather than sleeping a full
+                # interval after the work, which stretched each period
+                delay = next_due - time.monotonic()
+                if delay > 0 and self._stop_event.wait(delay):
+                    break
+                next_due = max(next_due + frame_interval, time.monotonic())
+
+                # The stream always hands out its newest frame, so stale ones
+                # are skipped for free; only a repeat of the last one is dropped
+                seq = self._stream.frame_seq
+                if seq == last_seq:
+                    continue
+                # Borrowed view: analysis finishes well within a frame
+                # interval, and _handle_motion gets a checked copy
+                seq, frame = self._stream.get_frame_view(timeout=frame_interval)
+                if frame is None or seq == last_seq:
                     continue
+                last_seq = seq
 
                 frame_count += 1
                 w, h = self.config.resolution
-                small = cv2.resize(frame, (w, h))
-
-                fg_mask = bg_sub.apply(small)
-
-                if frame_count < self.config.warmup_frames:
-                    time.sleep(frame_interval)
-                    continue
-
-                # Remove shadows and noise
-                _, thresh = cv2.threshold(fg_mask, 200, 255, cv2.THRESH_BINARY)
-                kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-                thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
-
-                contours, _ = cv2.findContours(
-                    thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
-                )
-                significant = [
-                    c for c in contours
-                    if cv2.contourArea(c) >= self.config.min_contour_area
-                ]
-                motion_area = sum(cv2.contourArea(c) for c in significant)
+                warming_up = frame_count < self.config.warmup_frames
+                mask = self._mask
+
+                if gpu is not None:
+                    gpu.apply(frame, None if warming_up else mask)
+                    if warming_up:
+                        continue
+                else:
+                    if frame.shape[1] == w and frame.shape[0] == h:
+                        small = frame  # already captured at analysis size
+                    else:
+                        # Nearest-neighbour is plain strided decimation;
+                        # MOG2 doesn't need a filtered downscale
+                        small = cv2.resize(
+                            frame, (w, h), dst=self._small,
+                            interpolation=cv2.INTER_NEAREST,
+                        )
+
+                    fg_mask = bg_sub.apply(small, fgmask=self._fg_mask)
+
+                    if warming_up:
+                        continue
+
+                    # Remove shadows and noise
+                    cv2.threshold(fg_mask, 200, 255, cv2.THRESH_BINARY, dst=mask)
+                    cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._kernel, dst=mask)
+
+                # Blob areas in one call; label 0 is the background
+                _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+                areas = stats[1:, cv2.CC_STAT_AREA]
+                significant = areas[areas >= self.config.min_contour_area]
+                motion_area = int(significant.sum())
                 total_area = w * h
                 motion_pct = (motion_area / total_area) * 100
 
                 if motion_pct >= self.config.threshold:
+                    snapshot = frame.copy()
+                    # A newer frame means the buffer may have been refilled
+                    # mid-copy; drop this one rather than keep a torn image
+                    if self._stream.frame_seq != seq:
+                        continue
                     self._handle_motion(
-                        frame, motion_pct, len(significant),
+                        snapshot, motion_pct, int(significant.size),
                     )
 
-                time.sleep(frame_interval)
-
     def _handle_motion(
         self, frame, motion_pct: float, contour_count: int,
     ) -> None:
-        now = time.time()
+        # One clock read serves the cooldown check and the event timestamp
+        now_ns = time.time_ns()
 
         # Run person detection if enabled
         person_count = 0
         if self.config.person_detection:
             person_count = self._count_people(frame)
 
-        prev_count = self._state.person_count
+        scene, row = self._scene, self._row
+        prev_count = int(scene.person_count[row])
         person_changed = person_count != prev_count
         motion_trigger = motion_pct >= self.config.threshold
 
@@ -181,49 +313,41 @@ class CameraMotionDetector:
             trigger = "motion"
 
         # Check cooldown (person changes always bypass cooldown)
-        if not person_changed and (now - self._last_event_time < self.config.cooldown):
+        if not person_changed and (
+            now_ns - self._last_event_ns < self.config.cooldown * 1_000_000_000
+        ):
             return
 
-        self._last_event_time = now
-        ts = datetime.now(timezone.utc)
-        self._state.last_motion_at = ts
+        self._last_event_ns = now_ns
+        ts_us = now_ns // 1000
+        ts = _from_us(ts_us)
+        scene.last_motion_us[row] = ts_us
 
         if person_changed:
-            self._state.person_count = person_count
-            self._state.last_person_change_at = ts
+            scene.person_count[row] = person_count
+            scene.last_person_change_us[row] = ts_us
 
         # Encode snapshot
-        _, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        jpeg = encode_jpeg(frame, 85)
 
         event = MotionEvent(
             camera_name=self.camera_name,
             timestamp=ts,
-            motion_percentage=round(motion_pct, 1),
+            motion_percentage=motion_pct,
             contour_count=contour_count,
             person_count=person_count,
             previous_person_count=prev_count,
-            snapshot=jpeg.tobytes(),
+            snapshot=jpeg,
             trigger=trigger,
         )
-        self._event_queue.put(event)
+        self._publish(event)
         logger.info(
             "motion/%s: %s — motion=%.1f%%, people=%d (was %d)",
             self.camera_name, trigger, motion_pct, person_count, prev_count,
         )
 
     def _count_people(self, frame) -> int:
-        model = self._yolo_loader()
-        if model is None:
-            return 0
-        results = model(
-            frame,
-            conf=self.config.person_confidence,
-            classes=[0],  # COCO class 0 = person
-            verbose=False,
-        )
-        if results and results[0].boxes is not None:
-            return len(results[0].boxes)
-        return 0
+        return self._count_people_fn(frame, self.config.person_confidence)
 
 class MotionDetectorManager:
     """Orchestrates motion detection across all cameras."""
@@ -242,15 +366,29 @@ class MotionDetectorManager:
             per_camera_configs: optional per-camera overrides
             streams: shared StreamCapture instances keyed by camera name
         """
-        self.event_queue: queue.Queue[MotionEvent] = queue.Queue()
+        # Parallelism comes from one thread per camera; OpenCV's own pool
+        # would oversubscribe the CPU on top of that, and at analysis size
+        # its dispatch (and the OpenCL probe) costs more than it saves.
+        cv2.setNumThreads(1)
+        cv2.ocl.setUseOpenCL(False)
+
+        # Pending events, strongest per camera; swapped out whole on drain
+        self._events: dict[str, MotionEvent] = {}
+        self._events_lock = threading.Lock()
+        self._on_event = None  # callback() fired after an event is queued
         self._stop_event = threading.Event()
         self._detectors: dict[str, CameraMotionDetector] = {}
         self._yolo_model = None
         self._yolo_lock = threading.Lock()
         self._yolo_model_name = global_config.yolo_model
+        self._yolo_precision = global_config.yolo_precision
+        self._yolo_queue: queue.Queue[tuple[np.ndarray, float, Future]] = queue.Queue()
+        self._yolo_thread: threading.Thread | None = None
 
         per_camera_configs = per_camera_configs or {}
         streams = streams or {}
+        self._scene = _SceneArrays(len(cameras))
+        self._rows: dict[str, int] = {}  # camera name -> row in _scene
 
         for name, cam_info in cameras.items():
             stream = streams.get(name)
@@ -262,10 +400,13 @@ class MotionDetectorManager:
                 camera_name=name,
                 stream=stream,
                 config=config,
-                event_queue=self.event_queue,
+                publish=self._publish_event,
                 stop_event=self._stop_event,
-                yolo_loader=self._get_yolo_model,
+                count_people=self.count_people,
+                scene=self._scene,
+                row=len(self._rows),
             )
+            self._rows[name] = len(self._rows)
             self._detectors[name] = detector
 
     def _get_yolo_model(self):
@@ -278,13 +419,96 @@ class MotionDetectorManager:
             try:
                 from ultralytics import YOLO
                 logger.info("Loading YOLO model: %s", self._yolo_model_name)
-                self._yolo_model = YOLO(f"{self._yolo_model_name}.pt")
-                return self._yolo_model
+                model = YOLO(f"{self._yolo_model_name}.pt")
             except Exception as e:
                 logger.error("Failed to load YOLO model: %s", e)
                 return None
+            if self._yolo_precision != "fp32":
+                model = self._load_yolo_engine(model) or model
+            self._yolo_model = model
+            return self._yolo_model
+
+    def _load_yolo_engine(self, model):
+        """Return a reduced-precision TensorRT build of ``model``, or None.
+
+        The engine is exported once and cached as <model>-<precision>.engine.
+        """
+        from ultralytics import YOLO
+
+        precision = self._yolo_precision
+        if precision not in ("fp16", "int8"):
+            logger.warning("Unknown yolo_precision %r, using fp32", precision)
+            return None
+        engine = Path(f"{self._yolo_model_name}-{precision}.engine")
+        try:
+            if not engine.exists():
+                logger.info("Exporting %s TensorRT engine (one-off, slow)", precision)
+                options = {"half": True} if precision == "fp16" else {"int8": True, "data": "coco8.yaml"}
+                # Dynamic batch so _run_yolo_batch can pass several frames
+                exported = model.export(
+                    format="engine", dynamic=True, batch=_YOLO_MAX_BATCH, verbose=False, **options,
+                )
+                os.replace(exported, engine)
+            return YOLO(str(engine), task="detect")
+        except Exception as e:
+            logger.warning("TensorRT %s engine unavailable, using fp32: %s", precision, e)
+            return None
+
+    def count_people(self, frame: np.ndarray, confidence: float) -> int:
+        """Count people in a frame, batched with other cameras' requests."""
+        future: Future = Future()
+        self._yolo_queue.put((frame, confidence, future))
+        try:
+            return future.result(timeout=_YOLO_TIMEOUT)
+        except FutureTimeout:
+            logger.warning("YOLO did not answer within %ss", _YOLO_TIMEOUT)
+            return 0
+
+    def _yolo_worker(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                batch = [self._yolo_queue.get(timeout=1.0)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + _YOLO_BATCH_WINDOW
+            while len(batch) < _YOLO_MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._yolo_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run_yolo_batch(batch)
+
+    def _run_yolo_batch(self, batch: list[tuple[np.ndarray, float, Future]]) -> None:
+        model = self._get_yolo_model()
+        if model is None:
+            for _, _, future in batch:
+                future.set_result(0)
+            return
+        try:
+            # One forward pass at the lowest requested confidence; each
+            # camera's own threshold is applied to its boxes below
+            results = model(
+                [frame for frame, _, _ in batch],
+                conf=min(conf for _, conf, _ in batch),
+                classes=[0],  # COCO class 0 = person
+                verbose=False,
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, conf, future), result in zip(batch, results):
+            boxes = result.boxes
+            future.set_result(0 if boxes is None else int((boxes.conf >= conf).sum()))
 
     def start(self) -> None:
+        self._yolo_thread = threading.Thread(
+            target=self._yolo_worker, daemon=True, name="motion-yolo",
+        )
+        self._yolo_thread.start()
         for detector in self._detectors.values():
             detector.start()
 
@@ -303,48 +527,54 @@ class MotionDetectorManager:
             return True
         return False
 
-    def get_pending_events(self) -> list[MotionEvent]:
-        events = []
-        while True:
-            try:
-                events.append(self.event_queue.get_nowait())
-            except queue.Empty:
-                break
+    def set_event_listener(self, callback) -> None:
+        """Register callback() to be fired whenever an event is queued."""
+        self._on_event = callback
+
+    def _publish_event(self, event: MotionEvent) -> None:
+        with self._events_lock:
+            pending = self._events.get(event.camera_name)
+            if pending is None or event.motion_percentage > pending.motion_percentage:
+                self._events[event.camera_name] = event
+        if self._on_event is not None:
+            self._on_event()
+
+    def get_pending_events(self) -> dict[str, MotionEvent]:
+        """Drain pending events: the highest-motion one per camera."""
+        with self._events_lock:
+            events, self._events = self._events, {}
         return events
 
     def get_scene_state(self, camera_name: str | None = None) -> dict[str, dict]:
-        result = {}
-        detectors = (
-            {camera_name: self._detectors[camera_name]}
-            if camera_name and camera_name in self._detectors
-            else self._detectors
-        )
-        for name, detector in detectors.items():
-            state = detector.state
-            result[name] = {
-                "person_count": state.person_count,
-                "last_person_change_at": (
-                    state.last_person_change_at.isoformat()
-                    if state.last_person_change_at else None
-                ),
-                "last_motion_at": (
-                    state.last_motion_at.isoformat()
-                    if state.last_motion_at else None
-                ),
-                "enabled": detector.is_enabled,
+        if camera_name and camera_name in self._detectors:
+            names = [camera_name]
+        else:
+            names = list(self._detectors)
+        rows = [self._rows[name] for name in names]
+        scene = self._scene
+        people = scene.person_count[rows].tolist()
+        changed = _iso_column(scene.last_person_change_us[rows])
+        motion = _iso_column(scene.last_motion_us[rows])
+        return {
+            name: {
+                "person_count": people[i],
+                "last_person_change_at": changed[i],
+                "last_motion_at": motion[i],
+                "enabled": self._detectors[name].is_enabled,
             }
-        return result
+            for i, name in enumerate(names)
+        }
 
     def status(self) -> dict[str, dict]:
-        result = {}
-        for name, detector in self._detectors.items():
-            state = detector.state
-            result[name] = {
-                "enabled": detector.is_enabled,
-                "person_count": state.person_count,
-                "last_motion_at": (
-                    state.last_motion_at.isoformat()
-                    if state.last_motion_at else None
-                ),
+        names = list(self._detectors)
+        rows = [self._rows[name] for name in names]
+        people = self._scene.person_count[rows].tolist()
+        motion = _iso_column(self._scene.last_motion_us[rows])
+        return {
+            name: {
+                "enabled": self._detectors[name].is_enabled,
+                "person_count": people[i],
+                "last_motion_at": motion[i],
             }
-        return result
+            for i, name in enumerate(names)
+        }
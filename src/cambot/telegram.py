@@ -1,8 +1,9 @@
 import asyncio
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
-from telegram import Update
+from telegram import InputMediaPhoto, Update
 from telegram.constants import ChatAction
 from telegram.ext import Application, CommandHandler, MessageHandler, filters
 
@@ -32,8 +33,21 @@ class TelegramBot:
 
         self._loop: asyncio.AbstractEventLoop | None = None
 
+        # Agent turns run here rather than on the loop's default pool.
+        # SecurityAgent.chat holds the agent lock for the whole turn, so
+        # extra workers would only park on it; queued messages wait here.
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="agent-chat",
+        )
+
+        # Chats awaiting a reply (chat_id -> in-flight messages), kept
+        # "typing" by one shared supervisor task instead of a task each
+        self._active_typing: dict[int, int] = {}
+        self._typing_supervisor: asyncio.Task | None = None
+        self._typing_first: set[asyncio.Task] = set()  # initial sends in flight
+
         async def _capture_loop(app):
-            self._loop = asyncio.get_event_loop()
+            self._loop = asyncio.get_running_loop()
 
         self.app = (
             Application.builder()
@@ -46,17 +60,39 @@ class TelegramBot:
             MessageHandler(filters.TEXT & ~filters.COMMAND, self._handle_message)
         )
 
-    async def _typing_loop(self, chat_id):
-        """Send typing action every 5 seconds until cancelled."""
+    async def _typing_supervise(self):
+        """Refresh the typing action for all active chats every 5 seconds."""
+        while self._active_typing:
+            await asyncio.sleep(5)
+            await asyncio.gather(
+                *(self._send_typing(cid) for cid in list(self._active_typing)),
+                return_exceptions=True,
+            )
+        self._typing_supervisor = None
+
+    def _start_typing(self, chat_id: int) -> None:
+        count = self._active_typing.get(chat_id, 0)
+        self._active_typing[chat_id] = count + 1
+        if count == 0:
+            # Show it right away, without holding up the agent call for the
+            # round-trip; the supervisor only refreshes
+            task = asyncio.create_task(self._send_first_typing(chat_id))
+            self._typing_first.add(task)
+            task.add_done_callback(self._typing_first.discard)
+        if self._typing_supervisor is None:
+            self._typing_supervisor = asyncio.create_task(self._typing_supervise())
+
+    async def _send_first_typing(self, chat_id: int) -> None:
         try:
-            while True:
-                await self.app.bot.send_chat_action(
-                    chat_id=chat_id, action=ChatAction.TYPING
-                )
-                await asyncio.sleep(5)
-        except asyncio.CancelledError:
+            await self._send_typing(chat_id)
+        except Exception:
             pass
 
+    def _stop_typing(self, chat_id: int) -> None:
+        count = self._active_typing.pop(chat_id, 0) - 1
+        if count > 0:
+            self._active_typing[chat_id] = count
+
     async def _cmd_start(self, update: Update, context) -> None:
         await update.message.reply_text(
             "Security camera monitor ready. Ask me anything about your cameras."
@@ -68,21 +104,18 @@ class TelegramBot:
             return
 
         chat_id = update.effective_chat.id
-        typing_task = asyncio.create_task(self._typing_loop(chat_id))
+        self._start_typing(chat_id)
 
         try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, self.agent.chat, text)
+            response = await self._loop.run_in_executor(
+                self._executor, self.agent.chat, text,
+            )
             photos = self.agent.pop_pending_photos()
         finally:
-            typing_task.cancel()
-            await typing_task
+            self._stop_typing(chat_id)
 
         await update.message.reply_text(response)
-        for jpeg_data, caption in photos:
-            await self.app.bot.send_photo(
-                chat_id=chat_id, photo=jpeg_data, caption=caption
-            )
+        await self._send_photos(chat_id, photos)
 
     async def _send_message(self, chat_id: int | str, message: str) -> None:
         await self.app.bot.send_message(chat_id=chat_id, text=message)
@@ -90,9 +123,21 @@ class TelegramBot:
     async def _send_photos(
         self, chat_id: int | str, photos: list[tuple[bytes, str]]
     ) -> None:
-        for jpeg_data, caption in photos:
-            await self.app.bot.send_photo(
-                chat_id=chat_id, photo=jpeg_data, caption=caption
+        # Albums take 2-10 photos, so larger sets go out in chunks of 10
+        for i in range(0, len(photos), 10):
+            chunk = photos[i:i + 10]
+            if len(chunk) == 1:
+                jpeg_data, caption = chunk[0]
+                await self.app.bot.send_photo(
+                    chat_id=chat_id, photo=jpeg_data, caption=caption
+                )
+                continue
+            await self.app.bot.send_media_group(
+                chat_id=chat_id,
+                media=[
+                    InputMediaPhoto(media=jpeg_data, caption=caption)
+                    for jpeg_data, caption in chunk
+                ],
             )
 
     async def _send_typing(self, chat_id: int | str) -> None:
@@ -124,4 +169,7 @@ class TelegramBot:
             )
 
     def run(self) -> None:
-        self.app.run_polling(allowed_updates=Update.ALL_TYPES)
+        try:
+            self.app.run_polling(allowed_updates=Update.ALL_TYPES)
+        finally:
+            self._executor.shutdown(wait=False)
@@ -1,4 +1,7 @@
-import base64
+import binascii
+import time
+from dataclasses import dataclass
+from typing import Callable
 
 from cambot.camera import CameraManager, CameraCaptureError
 from cambot.context import MemoryStore
@@ -256,31 +259,278 @@ TOOL_DEFINITIONS = [
     },
 ]
 
+# The definitions are identical on every request: mark the end of the list
+# as a prompt-cache breakpoint so the API reuses the processed tool prefix
+# instead of re-reading it each turn
+TOOL_DEFINITIONS[-1]["cache_control"] = {"type": "ephemeral"}
 
-def _make_image_content(label: str, jpeg_data: bytes) -> list[dict]:
+# Read-only capture tools: several of these in one model response are
+# independent and may run side by side
+CONCURRENT_TOOLS = frozenset({
+    "capture_snapshot",
+    "capture_home_snapshots",
+    "capture_all_snapshots",
+    "capture_location_snapshots",
+})
+
+
+# Recent snapshots by camera name: (monotonic time, jpeg). A follow-up such
+# as "show me" right after a check reuses the frame instead of capturing again.
+_SNAPSHOT_TTL = 2.0
+_SNAPSHOT_CACHE: dict[str, tuple[float, bytes]] = {}
+
+
+def _cached_capture(camera_manager: CameraManager, name: str) -> bytes:
+    cached = _SNAPSHOT_CACHE.get(name)
+    if cached is not None and time.monotonic() - cached[0] < _SNAPSHOT_TTL:
+        return cached[1]
+    jpeg_data = camera_manager.capture_snapshot(name)
+    _SNAPSHOT_CACHE[name] = (time.monotonic(), jpeg_data)
+    return jpeg_data
+
+
+def _cached_capture_multiple(camera_manager: CameraManager, names: list[str]) -> dict[str, bytes | str]:
+    now = time.monotonic()
+    results: dict[str, bytes | str] = {}
+    misses = []
+    for name in names:
+        cached = _SNAPSHOT_CACHE.get(name)
+        if cached is not None and now - cached[0] < _SNAPSHOT_TTL:
+            results[name] = cached[1]
+        else:
+            misses.append(name)
+    if misses:
+        fresh = camera_manager.capture_multiple(misses)
+        now = time.monotonic()
+        for name, data in fresh.items():
+            if isinstance(data, bytes):
+                _SNAPSHOT_CACHE[name] = (now, data)
+        results.update(fresh)
+    return results
+
+
+def _b64encode(jpeg_data: bytes) -> str:
+    return binascii.b2a_base64(jpeg_data, newline=False).decode("ascii")
+
+
+# Copied per image: only "data" differs, and copying is cheaper than
+# rebuilding the literal
+_IMAGE_SOURCE = {"type": "base64", "media_type": "image/jpeg", "data": None}
+
+
+def _make_image_content(label: str, b64_data: str) -> list[dict]:
+    source = _IMAGE_SOURCE.copy()
+    source["data"] = b64_data
     return [
         {"type": "text", "text": label},
-        {
-            "type": "image",
-            "source": {
-                "type": "base64",
-                "media_type": "image/jpeg",
-                "data": base64.b64encode(jpeg_data).decode("ascii"),
-            },
-        },
+        {"type": "image", "source": source},
     ]
 
 
+_NO_HOME_MSG = "No cameras found for home '{}'. Available homes: {}"
+_NO_LOCATION_MSG = "No cameras found at location '{}'. Available locations: {}"
+_NO_ENABLED_MSG = "No enabled cameras found."
+_NO_SNAPSHOTS_MSG = "No snapshots captured."
+
+
 def _build_snapshot_content(results: dict[str, bytes | str], camera_manager: CameraManager) -> list[dict] | str:
+    # Split once so each loop below handles a single shape; failures are
+    # listed after the images (results order is completion order anyway)
+    ok: list[tuple[str, bytes]] = []
+    failed: list[tuple[str, str]] = []
+    for item in results.items():
+        (ok if type(item[1]) is bytes else failed).append(item)
+
+    cameras = camera_manager.cameras
     content: list[dict] = []
-    for name, data in results.items():
-        cam = camera_manager.cameras[name]
-        label = f"Snapshot from '{cam.display_name}' ({cam.home} / {cam.location}):"
-        if isinstance(data, bytes):
-            content.extend(_make_image_content(label, data))
-        else:
-            content.append({"type": "text", "text": f"{cam.display_name}: {data}"})
-    return content if content else "No snapshots captured."
+    # Cameras sharing a stream can return the very same JPEG object; encode
+    # it once. Keying on id() is safe while results keeps the bytes alive.
+    encoded: dict[int, str] = {}
+    for name, data in ok:
+        b64_data = encoded.get(id(data))
+        if b64_data is None:
+            b64_data = encoded[id(data)] = _b64encode(data)
+        content.extend(_make_image_content(cameras[name].snapshot_label, b64_data))
+    for name, error in failed:
+        content.append({"type": "text", "text": f"{cameras[name].display_name}: {error}"})
+    return content if content else _NO_SNAPSHOTS_MSG
+
+
+def _snapshot_cameras(camera_manager: CameraManager, names: list[str]) -> list[dict] | str:
+    return _build_snapshot_content(
+        _cached_capture_multiple(camera_manager, names), camera_manager,
+    )
+
+
+@dataclass(slots=True)
+class _ToolContext:
+    camera_manager: CameraManager
+    memory_store: MemoryStore
+    watcher: object = None
+    photo_queue: list | None = None
+    motion_detector: object = None
+
+
+def _get_watcher_status(ctx: _ToolContext, tool_input: dict) -> str:
+    if ctx.watcher is None:
+        return "Autonomous monitoring is not running."
+    status = ctx.watcher.status()
+    lines = (
+        f"Running: {status.running}",
+        f"Last check: {status.last_check_at}" if status.last_check_at
+        else "Last check: not yet (first check pending)",
+        status.next_check_at and f"Next check at: {status.next_check_at}",
+        f"Current interval: {status.interval_seconds // 60} minutes",
+        status.last_schedule_reason
+        and f"Interval reason: {status.last_schedule_reason}",
+        status.focus_cameras
+        and f"Next check focused on: {', '.join(status.focus_cameras)}",
+        status.last_report and f"Last report: {status.last_report}",
+    )
+    return "\n".join(line for line in lines if line)
+
+
+def _schedule_next_check(ctx: _ToolContext, tool_input: dict) -> str:
+    minutes = tool_input["minutes"]
+    reason = tool_input.get("reason", "")
+    return f"Next check scheduled in {minutes} minutes. ({reason})"
+
+
+def _save_memory(ctx: _ToolContext, tool_input: dict) -> str:
+    ctx.memory_store.append(tool_input["content"])
+    return f"Remembered: {tool_input['content']}"
+
+
+def _rewrite_memory(ctx: _ToolContext, tool_input: dict) -> str:
+    ctx.memory_store.rewrite(tool_input["content"])
+    return "Memory rewritten with updated version."
+
+
+def _clear_memory(ctx: _ToolContext, tool_input: dict) -> str:
+    ctx.memory_store.clear()
+    return "Memory cleared."
+
+
+def _capture_snapshot(ctx: _ToolContext, tool_input: dict) -> str | list[dict]:
+    camera_manager = ctx.camera_manager
+    name = tool_input["camera_name"]
+    try:
+        jpeg_data = _cached_capture(camera_manager, name)
+    except CameraCaptureError as e:
+        return f"Failed to capture snapshot: {e}"
+    return _make_image_content(
+        camera_manager.cameras[name].snapshot_label, _b64encode(jpeg_data),
+    )
+
+
+def _capture_home_snapshots(ctx: _ToolContext, tool_input: dict) -> str | list[dict]:
+    camera_manager = ctx.camera_manager
+    home = tool_input["home"]
+    cams = camera_manager.get_cameras_by_home(home)
+    if not cams:
+        return _NO_HOME_MSG.format(home, ", ".join(camera_manager.get_homes()))
+    return _snapshot_cameras(camera_manager, [c.name for c in cams])
+
+
+def _capture_all_snapshots(ctx: _ToolContext, tool_input: dict) -> str | list[dict]:
+    camera_manager = ctx.camera_manager
+    enabled = camera_manager.get_enabled_names()
+    if not enabled:
+        return _NO_ENABLED_MSG
+    return _snapshot_cameras(camera_manager, enabled)
+
+
+def _capture_location_snapshots(ctx: _ToolContext, tool_input: dict) -> str | list[dict]:
+    camera_manager = ctx.camera_manager
+    location = tool_input["location"]
+    home = tool_input.get("home")
+    cams = camera_manager.get_cameras_by_location(location, home=home)
+    if not cams:
+        return _NO_LOCATION_MSG.format(location, ", ".join(camera_manager.get_locations()))
+    return _snapshot_cameras(camera_manager, [c.name for c in cams])
+
+
+def _send_photo(ctx: _ToolContext, tool_input: dict) -> str:
+    camera_manager = ctx.camera_manager
+    name = tool_input["camera_name"]
+    caption = tool_input.get("caption", "")
+    try:
+        jpeg_data = _cached_capture(camera_manager, name)
+    except CameraCaptureError as e:
+        return f"Failed to capture photo to send: {e}"
+    cam = camera_manager.cameras[name]
+    if not caption:
+        caption = f"{cam.display_name} ({cam.home} / {cam.location})"
+    if ctx.photo_queue is not None:
+        ctx.photo_queue.append((jpeg_data, caption))
+        return f"Photo from '{cam.display_name}' queued for delivery to user."
+    return f"Photo captured from '{cam.display_name}' but no delivery channel available."
+
+
+def _toggle_motion_detection(ctx: _ToolContext, tool_input: dict) -> str:
+    motion_detector = ctx.motion_detector
+    if motion_detector is None:
+        return "Motion detection is not available (not configured)."
+    cam_name = tool_input["camera_name"]
+    enabled = tool_input["enabled"]
+    if enabled:
+        success = motion_detector.enable_camera(cam_name)
+    else:
+        success = motion_detector.disable_camera(cam_name)
+    if success:
+        state = "enabled" if enabled else "disabled"
+        return f"Motion detection {state} for camera '{cam_name}'."
+    return f"Camera '{cam_name}' not found or motion detection not configured for it."
+
+
+def _get_motion_status(ctx: _ToolContext, tool_input: dict) -> str:
+    if ctx.motion_detector is None:
+        return "Motion detection is not available (not configured)."
+    status = ctx.motion_detector.status()
+    if not status:
+        return "No cameras configured for motion detection."
+    return "Motion detection status:\n" + "\n".join(
+        f"  - {name}: {'ACTIVE' if info['enabled'] else 'disabled'}, "
+        f"{info.get('person_count', 0)} people, "
+        f"last motion: {info.get('last_motion_at', 'never')}"
+        for name, info in status.items()
+    )
+
+
+def _get_scene_state(ctx: _ToolContext, tool_input: dict) -> str:
+    if ctx.motion_detector is None:
+        return "Motion detection is not available (not configured)."
+    cam_name = tool_input.get("camera_name")
+    state = ctx.motion_detector.get_scene_state(cam_name)
+    if not state:
+        if cam_name:
+            return f"No motion detection configured for camera '{cam_name}'."
+        return "No cameras configured for motion detection."
+    return "Scene state:\n" + "\n".join(
+        f"  - {name}: {info['person_count']} people, "
+        f"last change: {info['last_person_change_at'] or 'never'}, "
+        f"last motion: {info['last_motion_at'] or 'never'}, "
+        f"detection: {'active' if info['enabled'] else 'disabled'}"
+        for name, info in state.items()
+    )
+
+
+# Tool name -> handler, one per entry in TOOL_DEFINITIONS
+_HANDLERS: dict[str, Callable[[_ToolContext, dict], str | list[dict]]] = {
+    "capture_snapshot": _capture_snapshot,
+    "capture_home_snapshots": _capture_home_snapshots,
+    "capture_all_snapshots": _capture_all_snapshots,
+    "save_memory": _save_memory,
+    "rewrite_memory": _rewrite_memory,
+    "clear_memory": _clear_memory,
+    "schedule_next_check": _schedule_next_check,
+    "get_watcher_status": _get_watcher_status,
+    "send_photo": _send_photo,
+    "capture_location_snapshots": _capture_location_snapshots,
+    "toggle_motion_detection": _toggle_motion_detection,
+    "get_motion_status": _get_motion_status,
+    "get_scene_state": _get_scene_state,
+}
 
 
 def execute_tool(
@@ -292,144 +542,10 @@ def execute_tool(
     photo_queue: list | None = None,
     motion_detector=None,
 ) -> str | list[dict]:
-
-    if tool_name == "get_watcher_status":
-        if watcher is None:
-            return "Autonomous monitoring is not running."
-        status = watcher.status()
-        lines = []
-        lines.append(f"Running: {status['running']}")
-        if status["last_check_at"]:
-            lines.append(f"Last check: {status['last_check_at']}")
-        else:
-            lines.append("Last check: not yet (first check pending)")
-        if status["next_check_at"]:
-            lines.append(f"Next check at: {status['next_check_at']}")
-        lines.append(f"Current interval: {status['interval_seconds'] // 60} minutes")
-        if status["last_schedule_reason"]:
-            lines.append(f"Interval reason: {status['last_schedule_reason']}")
-        if status.get("focus_cameras"):
-            lines.append(f"Next check focused on: {', '.join(status['focus_cameras'])}")
-        if status["last_report"]:
-            lines.append(f"Last report: {status['last_report']}")
-        return "\n".join(lines)
-
-    if tool_name == "schedule_next_check":
-        minutes = tool_input["minutes"]
-        reason = tool_input.get("reason", "")
-        return f"Next check scheduled in {minutes} minutes. ({reason})"
-
-    elif tool_name == "save_memory":
-        memory_store.append(tool_input["content"])
-        return f"Remembered: {tool_input['content']}"
-
-    elif tool_name == "rewrite_memory":
-        memory_store.rewrite(tool_input["content"])
-        return "Memory rewritten with updated version."
-
-    elif tool_name == "clear_memory":
-        memory_store.clear()
-        return "Memory cleared."
-
-    elif tool_name == "capture_snapshot":
-        name = tool_input["camera_name"]
-        try:
-            jpeg_data = camera_manager.capture_snapshot(name)
-        except CameraCaptureError as e:
-            return f"Failed to capture snapshot: {e}"
-        cam = camera_manager.cameras[name]
-        return _make_image_content(
-            f"Snapshot from '{cam.display_name}' ({cam.home} / {cam.location}):",
-            jpeg_data,
-        )
-
-    elif tool_name == "capture_home_snapshots":
-        home = tool_input["home"]
-        cams = camera_manager.get_cameras_by_home(home)
-        if not cams:
-            available = ", ".join(camera_manager.get_homes())
-            return f"No cameras found for home '{home}'. Available homes: {available}"
-        results = camera_manager.capture_multiple([c.name for c in cams])
-        return _build_snapshot_content(results, camera_manager)
-
-    elif tool_name == "capture_all_snapshots":
-        enabled = [c.name for c in camera_manager.cameras.values() if c.enabled]
-        if not enabled:
-            return "No enabled cameras found."
-        results = camera_manager.capture_multiple(enabled)
-        return _build_snapshot_content(results, camera_manager)
-
-    elif tool_name == "capture_location_snapshots":
-        location = tool_input["location"]
-        home = tool_input.get("home")
-        cams = camera_manager.get_cameras_by_location(location, home=home)
-        if not cams:
-            all_locations = sorted(set(c.location for c in camera_manager.cameras.values()))
-            return f"No cameras found at location '{location}'. Available locations: {', '.join(all_locations)}"
-        results = camera_manager.capture_multiple([c.name for c in cams])
-        return _build_snapshot_content(results, camera_manager)
-
-    elif tool_name == "send_photo":
-        name = tool_input["camera_name"]
-        caption = tool_input.get("caption", "")
-        try:
-            jpeg_data = camera_manager.capture_snapshot(name)
-        except CameraCaptureError as e:
-            return f"Failed to capture photo to send: {e}"
-        cam = camera_manager.cameras[name]
-        if not caption:
-            caption = f"{cam.display_name} ({cam.home} / {cam.location})"
-        if photo_queue is not None:
-            photo_queue.append((jpeg_data, caption))
-            return f"Photo from '{cam.display_name}' queued for delivery to user."
-        return f"Photo captured from '{cam.display_name}' but no delivery channel available."
-
-    elif tool_name == "toggle_motion_detection":
-        if motion_detector is None:
-            return "Motion detection is not available (not configured)."
-        cam_name = tool_input["camera_name"]
-        enabled = tool_input["enabled"]
-        if enabled:
-            success = motion_detector.enable_camera(cam_name)
-        else:
-            success = motion_detector.disable_camera(cam_name)
-        if success:
-            state = "enabled" if enabled else "disabled"
-            return f"Motion detection {state} for camera '{cam_name}'."
-        return f"Camera '{cam_name}' not found or motion detection not configured for it."
-
-    elif tool_name == "get_motion_status":
-        if motion_detector is None:
-            return "Motion detection is not available (not configured)."
-        status = motion_detector.status()
-        if not status:
-            return "No cameras configured for motion detection."
-        lines = ["Motion detection status:"]
-        for name, info in status.items():
-            state = "ACTIVE" if info["enabled"] else "disabled"
-            people = info.get("person_count", 0)
-            last = info.get("last_motion_at", "never")
-            lines.append(f"  - {name}: {state}, {people} people, last motion: {last}")
-        return "\n".join(lines)
-
-    elif tool_name == "get_scene_state":
-        if motion_detector is None:
-            return "Motion detection is not available (not configured)."
-        cam_name = tool_input.get("camera_name")
-        state = motion_detector.get_scene_state(cam_name)
-        if not state:
-            if cam_name:
-                return f"No motion detection configured for camera '{cam_name}'."
-            return "No cameras configured for motion detection."
-        lines = ["Scene state:"]
-        for name, info in state.items():
-            lines.append(
-                f"  - {name}: {info['person_count']} people, "
-                f"last change: {info['last_person_change_at'] or 'never'}, "
-                f"last motion: {info['last_motion_at'] or 'never'}, "
-                f"detection: {'active' if info['enabled'] else 'disabled'}"
-            )
-        return "\n".join(lines)
-
-    else:
+    handler = _HANDLERS.get(tool_name)
+    if handler is None:
         return f"Unknown tool: {tool_name}"
+    ctx = _ToolContext(
+        camera_manager, memory_store, watcher, photo_queue, motion_detector,
+    )
+    return handler(ctx, tool_input)
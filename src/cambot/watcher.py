@@ -1,9 +1,28 @@
+import logging
+import re
 import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
 from cambot.motion import MotionDetectorManager, MotionEvent
 
+logger = logging.getLogger(__name__)
+
 WATCH_OK = "WATCH_OK"
+_WATCH_OK_RE = re.compile(r"\s*WATCH_OK\.*\s*", re.IGNORECASE)
+
+
+@dataclass(slots=True)
+class WatcherStatus:
+    running: bool
+    last_check_at: str | None  # ISO 8601
+    next_check_at: str | None  # ISO 8601
+    last_report: str | None
+    last_schedule_reason: str | None
+    interval_seconds: int
+    focus_cameras: list[str] | None
+    motion_detection: dict | None = None
 
 
 class Watcher:
@@ -19,143 +38,163 @@ class Watcher:
         self._next_interval = default_interval
         self._on_alert = on_alert  # callback(alert_text: str, photos: list) or None
         self._on_activity = on_activity  # callback() fired when a check starts
-        self._stop_event = threading.Event()
+        # One condition covers every reason to wake: stop and motion, with
+        # the interval timer as its timeout
+        self._cv = threading.Condition()
+        self._stopped = False
+        self._motion_ready = False
         self._thread: threading.Thread | None = None
         self._motion_detector = motion_detector
+        if motion_detector:
+            motion_detector.set_event_listener(self._notify_motion)
 
         # Observable state
         self.running: bool = False
         self.last_check_at: datetime | None = None
-        self.next_check_at: datetime | None = None
+        self._deadline_ns: int | None = None  # time.monotonic_ns() of next check
+        # isoformat() strings for status(), refreshed only when the
+        # underlying time changes
+        self._last_check_iso: str | None = None
+        self._next_check_iso: tuple[int | None, str | None] = (None, None)
+        # "HH:MM" of the last alert, reused while still in the same minute
+        self._alert_hm: tuple[int, str] = (-1, "")
         self.last_report: str | None = None
         self.last_schedule_reason: str | None = None
         self._focus_cameras: list[str] | None = None
 
+    @property
+    def next_check_at(self) -> datetime | None:
+        """Wall-clock time of the next check, derived from the monotonic timer."""
+        if self._deadline_ns is None:
+            return None
+        return datetime.now(timezone.utc) + timedelta(
+            microseconds=(self._deadline_ns - time.monotonic_ns()) // 1000
+        )
+
     def start(self) -> None:
         self.running = True
-        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="watcher")
         self._thread.start()
 
     def stop(self) -> None:
-        self._stop_event.set()
+        with self._cv:
+            self._stopped = True
+            self._cv.notify_all()
         self.running = False
 
+    def _notify_motion(self) -> None:
+        with self._cv:
+            self._motion_ready = True
+            self._cv.notify_all()
+
+    def _woken(self) -> bool:
+        return self._stopped or self._motion_ready
+
+    def _wait(self, deadline_ns: int) -> dict[str, MotionEvent] | None:
+        """Sleep until the deadline or a motion event.
+
+        Returns the pending motion events by camera (empty when the timer
+        ran out), or None once stopped.
+        """
+        cv = self._cv
+        woken = self._woken
+        while True:
+            with cv:
+                remaining_ns = max(deadline_ns - time.monotonic_ns(), 0)
+                cv.wait_for(woken, timeout=remaining_ns / 1e9)
+                if self._stopped:
+                    return None
+                # Reset under the lock: an event queued after this point
+                # flags again rather than being missed
+                ready, self._motion_ready = self._motion_ready, False
+            if not ready:
+                return {}
+            events = self._motion_detector.get_pending_events()
+            if events:
+                return events
+
     def _loop(self) -> None:
-        while not self._stop_event.is_set():
-            self.next_check_at = datetime.now(timezone.utc) + timedelta(seconds=self._next_interval)
-
-            # Wait for timer, polling for motion events every second
-            remaining = self._next_interval
-            motion_events: list[MotionEvent] = []
-            while remaining > 0 and not self._stop_event.is_set():
-                wait_time = min(remaining, 1.0)
-                if self._stop_event.wait(timeout=wait_time):
-                    break
-                remaining -= wait_time
-
-                if self._motion_detector:
-                    events = self._motion_detector.get_pending_events()
-                    if events:
-                        motion_events.extend(events)
-                        break
-
-            if self._stop_event.is_set():
+        while True:
+            self._deadline_ns = time.monotonic_ns() + int(self._next_interval * 1_000_000_000)
+            motion_events = self._wait(self._deadline_ns)
+            if motion_events is None:
                 break
-
-            try:
-                if self._on_activity:
-                    self._on_activity()
-
-                if motion_events:
-                    report, next_minutes, schedule_reason, focus_cameras = (
-                        self._handle_motion_events(motion_events)
-                    )
-                else:
-                    report, next_minutes, schedule_reason, focus_cameras = self.agent.watch(
-                        focus_cameras=self._focus_cameras,
-                    )
-
+            # Inline on purpose: the next deadline and focus cameras come
+            # from what this check schedules, and checks must not overlap
+            self._run_check(motion_events)
+
+    def _run_check(self, motion_events: dict[str, MotionEvent]) -> None:
+        try:
+            if self._on_activity:
+                self._on_activity()
+
+            if motion_events:
+                report, next_minutes, schedule_reason, focus_cameras = (
+                    self.agent.watch_motion(motion_events)
+                )
+            else:
+                report, next_minutes, schedule_reason, focus_cameras = self.agent.watch(
+                    focus_cameras=self._focus_cameras,
+                )
+
+            # Only alert if the agent has something to say. Photos are only
+            # delivered with an alert through the callback; otherwise drop
+            # them without copying them out.
+            is_ok = not report or _WATCH_OK_RE.fullmatch(report) is not None
+            photos = []
+            if is_ok or not self._on_alert:
+                self.agent.discard_pending_photos()
+            else:
                 photos = self.agent.pop_pending_photos()
-                self.last_check_at = datetime.now(timezone.utc)
-                self.last_report = report
-
-                # Update interval and focus for next check
-                if next_minutes and next_minutes > 0:
-                    self._next_interval = next_minutes * 60
-                    self.last_schedule_reason = schedule_reason
-                    self._focus_cameras = focus_cameras  # may be None (= check all)
-                else:
-                    self._next_interval = self.default_interval
-                    self.last_schedule_reason = None
-                    self._focus_cameras = None
-
-                # Only alert if the agent has something to say
-                is_ok = report.strip().upper().replace(".", "") == WATCH_OK if report else True
-
-                if not is_ok:
-                    now = datetime.now(timezone.utc).strftime("%H:%M UTC")
-                    next_min = self._next_interval // 60
-                    alert_text = (
-                        f"--- Watch alert at {now} ---\n"
-                        f"{report}\n"
-                        f"--- Next check in {next_min} min ---"
-                    )
-                    if self._on_alert:
-                        self._on_alert(alert_text, photos)
-                    else:
-                        print(f"\n{alert_text}\n")
-
-            except Exception as e:
-                print(f"\nWatch error: {e}")
-                self._next_interval = self.default_interval
 
-    def _handle_motion_events(
-        self, events: list[MotionEvent],
-    ) -> tuple[str, int | None, str | None, list[str] | None]:
-        """Deduplicate motion events and call agent with motion context."""
-        # Keep highest motion per camera
-        by_camera: dict[str, MotionEvent] = {}
-        for event in events:
-            existing = by_camera.get(event.camera_name)
-            if existing is None or event.motion_percentage > existing.motion_percentage:
-                by_camera[event.camera_name] = event
-
-        camera_names = list(by_camera.keys())
-        motion_context = []
-        for cam_name, event in by_camera.items():
-            line = (
-                f"- {cam_name}: {event.motion_percentage}% motion, "
-                f"{event.contour_count} regions, "
-                f"{event.person_count} people detected "
-                f"(was {event.previous_person_count}), "
-                f"trigger={event.trigger}, "
-                f"at {event.timestamp.strftime('%H:%M:%S UTC')}"
-            )
-            motion_context.append(line)
-
-        motion_snapshots = {
-            name: event.snapshot
-            for name, event in by_camera.items()
-            if event.snapshot
-        }
-
-        return self.agent.watch_motion(
-            motion_cameras=camera_names,
-            motion_context="\n".join(motion_context),
-            motion_snapshots=motion_snapshots,
+            now = datetime.now(timezone.utc)
+            self.last_check_at = now
+            self._last_check_iso = now.isoformat()
+            self.last_report = report
+
+            # Update interval and focus for next check
+            if next_minutes and next_minutes > 0:
+                self._next_interval = next_minutes * 60
+                self.last_schedule_reason = schedule_reason
+                self._focus_cameras = focus_cameras  # may be None (= check all)
+            else:
+                self._next_interval = self.default_interval
+                self.last_schedule_reason = None
+                self._focus_cameras = None
+
+            if not is_ok:
+                minute = now.hour * 60 + now.minute
+                if self._alert_hm[0] != minute:
+                    self._alert_hm = (minute, f"{now:%H:%M}")
+                next_min = self._next_interval // 60
+                alert_text = (
+                    f"--- Watch alert at {self._alert_hm[1]} UTC ---\n"
+                    f"{report}\n"
+                    f"--- Next check in {next_min} min ---"
+                )
+                if self._on_alert:
+                    self._on_alert(alert_text, photos)
+                else:
+                    print(f"\n{alert_text}\n")
+
+        except Exception:
+            logger.exception("watcher: check failed")
+            self._next_interval = self.default_interval
+
+    def status(self) -> WatcherStatus:
+        """Return a snapshot of the current watcher state."""
+        deadline, next_check_iso = self._next_check_iso
+        if deadline != self._deadline_ns:
+            next_check_at = self.next_check_at
+            next_check_iso = next_check_at.isoformat() if next_check_at else None
+            self._next_check_iso = (self._deadline_ns, next_check_iso)
+        return WatcherStatus(
+            self.running,
+            self._last_check_iso,
+            next_check_iso,
+            self.last_report,
+            self.last_schedule_reason,
+            self._next_interval,
+            self._focus_cameras,
+            self._motion_detector.status() if self._motion_detector else None,
         )
-
-    def status(self) -> dict:
-        """Return the current watcher state as a dict."""
-        result = {
-            "running": self.running,
-            "last_check_at": self.last_check_at.isoformat() if self.last_check_at else None,
-            "next_check_at": self.next_check_at.isoformat() if self.next_check_at else None,
-            "last_report": self.last_report,
-            "last_schedule_reason": self.last_schedule_reason,
-            "interval_seconds": self._next_interval,
-            "focus_cameras": self._focus_cameras,
-        }
-        if self._motion_detector:
-            result["motion_detection"] = self._motion_detector.status()
-        return result
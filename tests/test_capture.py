@@ -0,0 +1,68 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from cambot.capture import StreamCapture
+
+
+class _FakeReactor:
+    def __init__(self):
+        self.calls = []
+
+    def call_later(self, delay, callback):
+        self.calls.append((delay, callback))
+
+    def add_reader(self, fd, callback):
+        pass
+
+    def remove_reader(self, fd):
+        pass
+
+
+class _FakeReader:
+    def __init__(self, frames: int):
+        self._frames = frames
+        self.released = False
+
+    def fileno(self):
+        return 0
+
+    def read(self):
+        if self._frames == 0:
+            return False, None  # ffmpeg exited
+        self._frames -= 1
+        return True, np.zeros((4, 4, 3), dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+
+class StreamOutageTest(unittest.TestCase):
+    def test_resumes_after_outage(self):
+        stream = StreamCapture("front", rtsp_url="rtsp://cam/stream")
+        stream._reactor = _FakeReactor()
+        first, second = _FakeReader(frames=1), _FakeReader(frames=2)
+
+        with mock.patch.object(stream, "_open_ffmpeg_pipe", side_effect=[first, second]):
+            stream._connect()
+            stream._on_readable()
+            stream._on_readable()  # stream ends
+
+            self.assertTrue(first.released)
+            self.assertFalse(stream.is_connected)
+            (delay, reconnect), = stream._reactor.calls
+            self.assertEqual(delay, stream._reconnect_delay)
+
+            reconnect()
+            stream._on_readable()
+            stream._on_readable()
+
+        self.assertTrue(stream.is_connected)
+        self.assertFalse(second.released)
+        self.assertEqual(stream.frame_seq, 3)
+        self.assertIsNotNone(stream.get_frame(timeout=0))
+
+
+if __name__ == "__main__":
+    unittest.main()